@@ -31,7 +31,7 @@ from .checkpointer import MongoDBCheckpointer
 from .summarizer_graph import schema_discovery_wrapper, SchemaDiscoveryState
 from .system_prompt import get_system_prompt
 from .utils.token_utils import estimate_token_count, chunk_data_by_tokens
-from .utils.s3_utils import upload_json_to_s3
+from .utils.s3_utils import upload_json_to_s3, upload_many_json_to_s3
 
 # Sandbox server can be imported as: from deepsense.sandbox.server import app
 # Run with: uvicorn deepsense.sandbox.server:app --reload
@@ -49,5 +49,6 @@ __all__ = [
     "estimate_token_count",
     "chunk_data_by_tokens",
     "upload_json_to_s3",
+    "upload_many_json_to_s3",
 ]
 
@@ -4,7 +4,7 @@ Implements LangGraph checkpointer interface to store workflow state in MongoDB.
 """
 
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pymongo import MongoClient
 import logging
@@ -18,6 +18,66 @@ except ImportError:
     LANGGRAPH_AVAILABLE = False
     logger.warning("langgraph.checkpoint.mongodb not available. Using fallback implementation.")
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Pool sizing and timeouts for MongoDB clients, so a slow or unreachable
+# server fails requests quickly instead of stalling the workers waiting on it
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 5,
+    "serverSelectionTimeoutMS": 3000,
+    "connectTimeoutMS": 3000,
+    "socketTimeoutMS": 10_000,
+    "waitQueueTimeoutMS": 2000,
+}
+
+# Type tag prefix marking payloads compressed by ZstdSerializer
+_ZSTD_TYPE_PREFIX = "zstd:"
+
+class ZstdSerializer:
+    """
+    Serializer wrapper that zstd-compresses checkpoint payloads.
+    
+    Wraps the saver's own serializer, so the checkpoint blob (channel_values,
+    messages) is compressed before being stored as BSON binary, while small
+    top-level fields like thread_id and checkpoint_id stay untouched and indexable.
+    Payloads written without compression are still loaded as-is.
+    """
+    
+    def __init__(self, serde: Any, level: int = 3, min_size: int = 1024):
+        """
+        Args:
+            serde: Underlying LangGraph serializer
+            level: zstd compression level
+            min_size: Payloads smaller than this (in bytes) are stored uncompressed
+        """
+        self.serde = serde
+        self.level = level
+        self.min_size = min_size
+    
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        # ZstdCompressor instances are not thread-safe, so build one per call
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        return f"{_ZSTD_TYPE_PREFIX}{type_}", compressed
+    
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith(_ZSTD_TYPE_PREFIX):
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+            type_ = type_[len(_ZSTD_TYPE_PREFIX):]
+        return self.serde.loads_typed((type_, payload))
+    
+    def __getattr__(self, name: str) -> Any:
+        # Delegate everything else (dumps/loads, etc.) to the wrapped serializer
+        return getattr(self.serde, name)
+
 class MongoDBCheckpointer:
     """
     MongoDB-based checkpointer for LangGraph workflow state persistence.
@@ -30,7 +90,8 @@ class MongoDBCheckpointer:
         self,
         connection_string: Optional[str] = None,
         database_name: str = "deepsense",
-        collection_name: str = "checkpoints"
+        collection_name: str = "checkpoints",
+        compress_checkpoints: bool = True
     ):
         """
         Initialize MongoDB checkpointer.
@@ -39,17 +100,28 @@ class MongoDBCheckpointer:
             connection_string: MongoDB connection string (defaults to MONGODB_URI env var)
             database_name: Name of the database
             collection_name: Name of the collection for checkpoints
+            compress_checkpoints: zstd-compress checkpoint payloads and the wire
+                                  protocol (requires the zstandard package)
         """
         self.connection_string = connection_string or os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
         self.database_name = database_name
         self.collection_name = collection_name
+        self.compress_checkpoints = compress_checkpoints and ZSTD_AVAILABLE
+        
+        if compress_checkpoints and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed. Checkpoints will be stored uncompressed.")
         
         try:
-            self.client = MongoClient(self.connection_string)
+            client_kwargs = dict(MONGO_CLIENT_OPTIONS)
+            if self.compress_checkpoints:
+                client_kwargs["compressors"] = "zstd"
+            self.client = MongoClient(self.connection_string, **client_kwargs)
             
             # Use LangGraph's MongoDBSaver if available
             if LANGGRAPH_AVAILABLE:
                 self.saver = MongoDBSaver(self.client, db_name=database_name, collection_name=collection_name)
+                if self.compress_checkpoints:
+                    self.saver.serde = ZstdSerializer(self.saver.serde)
                 logger.info(f"✅ Initialized LangGraph MongoDBSaver: {database_name}.{collection_name}")
             else:
                 # Fallback: create our own collection
@@ -85,13 +157,6 @@ class MongoDBCheckpointer:
         """
         import uuid
         
-        if session_id:
-            # Check if session exists
-            existing = self.sessions_collection.find_one({"session_id": session_id})
-            if existing:
-                logger.info(f"✅ Session already exists: {session_id}")
-                return session_id
-        
         if not session_id:
             session_id = str(uuid.uuid4())
         
@@ -104,10 +169,18 @@ class MongoDBCheckpointer:
         }
         
         try:
-            self.sessions_collection.insert_one(session_doc)
-            logger.info(f"✅ Created session: {session_id}")
+            # One round trip whether or not the session exists: only inserts when missing
+            result = self.sessions_collection.update_one(
+                {"session_id": session_id},
+                {"$setOnInsert": session_doc},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                logger.info(f"✅ Created session: {session_id}")
+            else:
+                logger.info(f"✅ Session already exists: {session_id}")
         except Exception as e:
-            # If duplicate key error, session already exists
+            # If duplicate key error, a concurrent call created the session first
             if "duplicate key" in str(e).lower() or "E11000" in str(e):
                 logger.info(f"✅ Session already exists (duplicate): {session_id}")
             else:
@@ -5,21 +5,43 @@ Handles API client management and data retrieval for various data sources.
 
 import os
 import json
+import time
+import asyncio
+import threading
 import requests
-from typing import Dict, Any, List, Optional, Union, Callable
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 import inspect
-from functools import wraps
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from deepsense.utils.json_utils import json_loads, json_dumps
+from deepsense.utils.ttl_cache import TTLCache
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Tool metadata storage - maps (class_name, method_name) to tool metadata
-_tool_registry: Dict[str, Dict[str, Any]] = {}
+_tool_registry: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+# Reverse index - maps class_name to its registry keys, in definition order
+_tool_registry_by_class: Dict[str, List[Tuple[Optional[str], str]]] = defaultdict(list)
+
+@lru_cache(maxsize=None)
+def _get_signature(func: Callable) -> inspect.Signature:
+    """Cached inspect.signature for a plain (unbound) function."""
+    return inspect.signature(func)
 
 @dataclass
 class DataSourceConfig:
@@ -31,6 +53,54 @@ class DataSourceConfig:
     params: Optional[Dict[str, Any]] = None
     rate_limit: Optional[int] = None  # requests per minute
     timeout: int = 30
+    pool_connections: int = 32  # number of host pools kept by the HTTP adapter
+    pool_maxsize: int = 64  # max connections kept alive per host
+    max_retries: int = 3  # retries on connection errors and 429/502/503/504
+
+# requests sessions shared by datasources with identical connection settings, so
+# sources calling the same API (e.g. two CoinGecko wrappers) use one connection pool
+_session_pool: Dict[Tuple, requests.Session] = {}
+_session_pool_lock = threading.Lock()
+
+def _create_session(config: DataSourceConfig) -> requests.Session:
+    """Create a requests session with the config's headers, params and pooled adapter."""
+    session = requests.Session()
+    
+    # Pooled adapter so concurrent callers reuse connections, with backoff on transient errors
+    adapter = HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        max_retries=Retry(
+            total=config.max_retries,
+            backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset(["GET", "POST"])
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    
+    if config.headers:
+        session.headers.update(config.headers)
+    if config.params:
+        session.params.update(config.params)
+    return session
+
+def _get_session(config: DataSourceConfig) -> requests.Session:
+    """Get the shared session for a config's base URL, headers, params and pool settings."""
+    key = (
+        config.rest_url,
+        repr(sorted((config.headers or {}).items())),
+        repr(sorted((config.params or {}).items())),
+        config.pool_connections,
+        config.pool_maxsize,
+        config.max_retries
+    )
+    with _session_pool_lock:
+        session = _session_pool.get(key)
+        if session is None:
+            session = _session_pool[key] = _create_session(config)
+        return session
 
 def tool(
     name: Optional[str] = None,
@@ -60,10 +130,11 @@ def tool(
         if len(qualname_parts) > 1:
             class_name = qualname_parts[-2]
             method_name = qualname_parts[-1]
-            registry_key = f"{class_name}.{method_name}"
         else:
             # If no class in qualname, try to get from function's __self__ or annotations
-            registry_key = func.__name__
+            class_name = None
+            method_name = func.__name__
+        registry_key = (class_name, method_name)
         
         # Store metadata
         _tool_registry[registry_key] = {
@@ -73,12 +144,11 @@ def tool(
             "func": func,
             "method_name": func.__name__
         }
+        if class_name is not None and registry_key not in _tool_registry_by_class[class_name]:
+            _tool_registry_by_class[class_name].append(registry_key)
         
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-        
-        return wrapper
+        # Metadata lives in the registry, so the method itself is returned unwrapped
+        return func
     return decorator
 
 class DataSource(ABC):
@@ -86,53 +156,128 @@ class DataSource(ABC):
     
     def __init__(self, config: DataSourceConfig):
         self.config = config
-        self.session = requests.Session()
-        if config.headers:
-            self.session.headers.update(config.headers)
-        if config.params:
-            self.session.params.update(config.params)
+        # Shared with other datasources using the same API and connection settings
+        self.session = _get_session(config)
+        
+        # REST base URL with a single trailing slash; endpoints are appended to it
+        self._base_rest = config.rest_url.rstrip('/') + '/' if config.rest_url else None
+        
+        # Token bucket for client-side rate limiting (rate_limit is requests per minute)
+        self._bucket_tokens = float(config.rate_limit or 0)
+        self._bucket_last = time.monotonic()
+        self._bucket_lock = threading.Lock()
+        
+        # event loop -> aiohttp session for async requests, created lazily inside each loop
+        self._asessions: Dict[asyncio.AbstractEventLoop, 'aiohttp.ClientSession'] = {}
+        
+        # (endpoint, params) -> (validator headers, body) for conditional GETs
+        self._validator_cache = TTLCache(maxsize=256, ttl=3600)
+        
+        # Tools built by get_tools, cached per instance (they bind this instance's methods)
+        self._tools: Optional[List['Tool']] = None
+    
+    def _reserve_token(self) -> float:
+        """
+        Take a token from the rate-limit bucket.
+        
+        Returns:
+            Seconds to wait before sending the request (0 if a token was available)
+        """
+        rate = self.config.rate_limit
+        if not rate:
+            return 0.0
+        
+        with self._bucket_lock:
+            now = time.monotonic()
+            elapsed = now - self._bucket_last
+            self._bucket_last = now
+            self._bucket_tokens = min(float(rate), self._bucket_tokens + elapsed * rate / 60)
+            # Tokens may go negative: each caller reserves its slot and waits it out
+            self._bucket_tokens -= 1
+            if self._bucket_tokens >= 0:
+                return 0.0
+            return -self._bucket_tokens * 60 / rate
+    
+    def _take_token(self) -> None:
+        """Block until the rate limit allows another request."""
+        delay = self._reserve_token()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def _atake_token(self) -> None:
+        """Wait (without blocking the event loop) until the rate limit allows another request."""
+        delay = self._reserve_token()
+        if delay > 0:
+            await asyncio.sleep(delay)
     
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make a GET request to the data source."""
-        if not self.config.rest_url:
+        if not self._base_rest:
             return {"error": f"No REST URL configured for {self.config.name}"}
         
-        url = f"{self.config.rest_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        url = self._base_rest + endpoint.lstrip('/')
+        
+        # Config params are already on the session; requests merges them with these
+        self._take_token()
+        try:
+            response = self.session.get(url, params=params, timeout=self.config.timeout)
+            response.raise_for_status()
+            return json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"GET request failed for {self.config.name}: {e}")
+            return {"error": str(e), "source": self.config.name}
+    
+    def get_conditional(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Make a GET request that revalidates the previous response for the same endpoint and params.
+        
+        Sends If-None-Match / If-Modified-Since from the last response's ETag /
+        Last-Modified headers, and re-parses the previously stored body on a
+        304 Not Modified, so callers always get their own copy to modify.
+        Behaves like get() for servers that send neither header.
+        """
+        if not self._base_rest:
+            return {"error": f"No REST URL configured for {self.config.name}"}
         
-        # Combine config params with user params
-        request_params = {}
-        if self.config.params:
-            request_params.update(self.config.params)
-        if params:
-            request_params.update(params)
+        url = self._base_rest + endpoint.lstrip('/')
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        cached = self._validator_cache.get(key)
         
+        self._take_token()
         try:
-            response = self.session.get(url, params=request_params, timeout=self.config.timeout)
+            response = self.session.get(url, params=params, headers=cached[0] if cached else None,
+                                        timeout=self.config.timeout)
+            if response.status_code == 304 and cached:
+                return json_loads(cached[1])
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            body = json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"GET request failed for {self.config.name}: {e}")
             return {"error": str(e), "source": self.config.name}
+        
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if validators:
+            self._validator_cache.set(key, (validators, response.content))
+        return body
     
     def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make a POST request to the data source."""
-        if not self.config.rest_url:
+        if not self._base_rest:
             return {"error": f"No REST URL configured for {self.config.name}"}
         
-        url = f"{self.config.rest_url.rstrip('/')}/{endpoint.lstrip('/')}"
-        
-        # Combine config params with user params
-        request_params = {}
-        if self.config.params:
-            request_params.update(self.config.params)
-        if params:
-            request_params.update(params)
+        url = self._base_rest + endpoint.lstrip('/')
         
+        # Config params are already on the session; requests merges them with these
+        self._take_token()
         try:
-            response = self.session.post(url, json=data, params=request_params, timeout=self.config.timeout)
+            response = self.session.post(url, json=data, params=params, timeout=self.config.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"POST request failed for {self.config.name}: {e}")
             return {"error": str(e), "source": self.config.name}
     
@@ -149,14 +294,136 @@ class DataSource(ABC):
             "params": params
         }
         
+        self._take_token()
         try:
             response = self.session.post(url, json=data, timeout=self.config.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"RPC POST request failed for {self.config.name}: {e}")
             return {"error": str(e), "source": self.config.name}
     
+    def rpc_batch(self, calls: List[Tuple[str, Any]], rpc_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Make several JSON-RPC calls in a single batch POST.
+        
+        Args:
+            calls: (method, params) pairs
+            rpc_url: Optional RPC URL (defaults to config.rpc_url)
+            
+        Returns:
+            One response per call, in call order (an error dict for any call without a response)
+        """
+        url = rpc_url or self.config.rpc_url
+        if not url:
+            return [{"error": f"No RPC URL configured for {self.config.name}"}] * len(calls)
+        if not calls:
+            return []
+        
+        data = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        
+        self._take_token()
+        try:
+            response = self.session.post(url, json=data, timeout=self.config.timeout)
+            response.raise_for_status()
+            result = json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"RPC batch request failed for {self.config.name}: {e}")
+            return [{"error": str(e), "source": self.config.name}] * len(calls)
+        
+        if not isinstance(result, list):
+            # Batch rejected as a whole (e.g. a single error object)
+            return [result] * len(calls)
+        # Responses may arrive in any order; match them to calls by id
+        by_id = {item.get("id"): item for item in result if isinstance(item, dict)}
+        return [by_id.get(i, {"error": "No response for batched call", "source": self.config.name}) for i in range(len(calls))]
+    
+    async def _close_stale_sessions(self) -> None:
+        """Close sessions whose event loop has been closed (e.g. by a finished asyncio.run)."""
+        for loop in [loop for loop in self._asessions if loop.is_closed()]:
+            await self._asessions.pop(loop).close()
+    
+    async def _get_async_session(self) -> 'aiohttp.ClientSession':
+        """Get the aiohttp session for the running event loop, creating it if needed."""
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for async datasource requests")
+        
+        loop = asyncio.get_running_loop()
+        session = self._asessions.get(loop)
+        if session is None or session.closed:
+            await self._close_stale_sessions()
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.config.headers,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+            )
+            self._asessions[loop] = session
+        return session
+    
+    async def _arequest(self, method: str, url: str, label: str, **kwargs) -> Dict[str, Any]:
+        """Make an async HTTP request and parse the JSON response."""
+        # Outside the try: raises ImportError when aiohttp is missing, and the
+        # except clause below could not even be evaluated then
+        session = await self._get_async_session()
+        await self._atake_token()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                response.raise_for_status()
+                return json_loads(await response.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"{label} request failed for {self.config.name}: {e}")
+            return {"error": str(e), "source": self.config.name}
+    
+    async def aget(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make an async GET request to the data source."""
+        if not self._base_rest:
+            return {"error": f"No REST URL configured for {self.config.name}"}
+        
+        url = self._base_rest + endpoint.lstrip('/')
+        
+        # aiohttp has no session-level params, so config params are merged per call
+        request_params = {**self.config.params, **(params or {})} if self.config.params else params
+        
+        return await self._arequest("GET", url, "Async GET", params=request_params)
+    
+    async def apost(self, endpoint: str, data: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make an async POST request to the data source."""
+        if not self._base_rest:
+            return {"error": f"No REST URL configured for {self.config.name}"}
+        
+        url = self._base_rest + endpoint.lstrip('/')
+        
+        # aiohttp has no session-level params, so config params are merged per call
+        request_params = {**self.config.params, **(params or {})} if self.config.params else params
+        
+        return await self._arequest("POST", url, "Async POST", json=data, params=request_params)
+    
+    async def arpc_post(self, method: str, params: Any, rpc_url: Optional[str] = None) -> Dict[str, Any]:
+        """Make an async JSON-RPC POST request to the data source."""
+        url = rpc_url or self.config.rpc_url
+        if not url:
+            return {"error": f"No RPC URL configured for {self.config.name}"}
+        
+        data = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": method,
+            "params": params
+        }
+        
+        return await self._arequest("POST", url, "Async RPC POST", json=data, params=self.config.params)
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP session for the running event loop, and any left by closed loops."""
+        session = self._asessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+        await self._close_stale_sessions()
+    
     def get_data(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Retrieve data from the data source."""
         # Default implementation - can be overridden by subclasses
@@ -167,14 +434,37 @@ class DataSource(ABC):
         """Check if the data source is accessible."""
         pass
     
+    async def ahealth_check(self) -> bool:
+        """
+        Async health check.
+        Runs the synchronous health_check in a worker thread by default;
+        subclasses can override this with a native async implementation.
+        """
+        return await asyncio.to_thread(self.health_check)
+    
+    @staticmethod
+    def _wrap_user_action(data: Any, source_name: str) -> Dict[str, Any]:
+        """Wrap a tool result in the user_action envelope returned to the agent."""
+        return {
+            "user_action": True,
+            "data": data,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "source": source_name
+        }
+    
     def get_tools(self) -> List['Tool']:
         """
         Automatically create LangChain tools from methods decorated with @tool.
         Methods sharing the same tool name become a unified tool with action parameter.
         
+        Tools are built once per instance and cached.
+        
         Returns:
             List of LangChain Tool instances
         """
+        if self._tools is not None:
+            return list(self._tools)
+        
         try:
             from langchain_core.tools import Tool
             from pydantic import BaseModel, Field, create_model
@@ -185,33 +475,27 @@ class DataSource(ABC):
         decorated_methods: List[Dict[str, Any]] = []
         class_name = self.__class__.__name__
         
-        # Check all classes in MRO (Method Resolution Order) to find decorated methods
+        # Check all classes in MRO (Method Resolution Order) for methods registered by @tool
         for cls in self.__class__.__mro__:
             if cls == object or cls == ABC:
                 continue
             
-            for method_name in dir(cls):
+            for registry_key in _tool_registry_by_class.get(cls.__name__, ()):
+                method_name = registry_key[1]
                 if method_name.startswith('_'):
                     continue
                 
-                # Get the method from the class
-                method = getattr(cls, method_name, None)
-                if not method or not callable(method):
-                    continue
-                
-                # Check if method has tool metadata
-                registry_key = f"{cls.__name__}.{method_name}"
-                if registry_key not in _tool_registry:
-                    continue
-                
                 # Get the bound method from instance
-                bound_method = getattr(self, method_name)
+                bound_method = getattr(self, method_name, None)
+                if not bound_method or not callable(bound_method):
+                    continue
                 
                 metadata = _tool_registry[registry_key].copy()
                 metadata["method"] = bound_method
                 decorated_methods.append(metadata)
         
         if not decorated_methods:
+            self._tools = []
             return []
         
         # Group methods by tool name
@@ -240,7 +524,9 @@ class DataSource(ABC):
                     action_descriptions.append(f"- '{method_name}': {first_sentence}")
                     
                     # Collect parameters from method signature
-                    sig = inspect.signature(method)
+                    sig = _get_signature(method_data["func"])
+                    # Accepted kwargs, precomputed so each call only does set lookups
+                    method_data["param_names"] = frozenset(p for p in sig.parameters if p != 'self')
                     for param_name, param in sig.parameters.items():
                         if param_name == 'self':
                             continue
@@ -306,9 +592,8 @@ class DataSource(ABC):
                                 method = method_data["method"]
                                 try:
                                     # Filter kwargs to only include method's actual parameters
-                                    sig = inspect.signature(method)
-                                    method_params = {k: v for k, v in kwargs.items() 
-                                                   if k in sig.parameters and k != 'self'}
+                                    allowed = method_data["param_names"]
+                                    method_params = {k: v for k, v in kwargs.items() if k in allowed}
                                     
                                     result = method(**method_params)
                                     
@@ -318,18 +603,13 @@ class DataSource(ABC):
                                             if "user_action" not in result:
                                                 result["user_action"] = True
                                         else:
-                                            result = {
-                                                "user_action": True,
-                                                "data": result,
-                                                "timestamp": datetime.now().isoformat(),
-                                                "source": self.config.name
-                                            }
+                                            result = self._wrap_user_action(result, self.config.name)
                                     
-                                    return json.dumps(result, indent=2) if isinstance(result, (dict, list)) else str(result)
+                                    return json_dumps(result) if isinstance(result, (dict, list)) else str(result)
                                 except Exception as e:
                                     logger.error(f"Error in unified tool {tool_name} action {action}: {e}")
-                                    return json.dumps({"error": str(e), "action": action}, indent=2)
-                        return json.dumps({"error": f"Unknown action: {action}", "available_actions": [m["method_name"] for m in methods_list]}, indent=2)
+                                    return json_dumps({"error": str(e), "action": action})
+                        return json_dumps({"error": f"Unknown action: {action}", "available_actions": [m["method_name"] for m in methods_list]})
                     return unified_func
                 
                 tools.append(Tool(
@@ -344,9 +624,6 @@ class DataSource(ABC):
                 method = method_data["method"]
                 method_name = method_data["method_name"]
                 
-                # Get method signature
-                sig = inspect.signature(method)
-                params = {name: param for name, param in sig.parameters.items() if name != 'self'}
                 
                 def create_simple_func(method_func, user_action_flag):
                     def simple_func(*args, **kwargs) -> str:
@@ -359,17 +636,12 @@ class DataSource(ABC):
                                     if "user_action" not in result:
                                         result["user_action"] = True
                                 else:
-                                    result = {
-                                        "user_action": True,
-                                        "data": result,
-                                        "timestamp": datetime.now().isoformat(),
-                                        "source": self.config.name
-                                    }
+                                    result = self._wrap_user_action(result, self.config.name)
                             
-                            return json.dumps(result, indent=2) if isinstance(result, (dict, list)) else str(result)
+                            return json_dumps(result) if isinstance(result, (dict, list)) else str(result)
                         except Exception as e:
                             logger.error(f"Error in tool {tool_name}: {e}")
-                            return json.dumps({"error": str(e)}, indent=2)
+                            return json_dumps({"error": str(e)})
                     return simple_func
                 
                 tools.append(Tool(
@@ -378,15 +650,15 @@ class DataSource(ABC):
                     func=create_simple_func(method, method_data.get("user_action", False))
                 ))
         
-        return tools
+        self._tools = tools
+        return list(tools)
 
 class DataSourceManager:
     """Manages multiple data sources and provides unified access."""
     
     def __init__(self):
         self.sources: Dict[str, DataSource] = {}
-        self.cache: Dict[str, Any] = {}
-        self.cache_ttl: Dict[str, datetime] = {}
+        self.cache = TTLCache(maxsize=4096, ttl=300)
     
     def register_source(self, name: str, source: DataSource) -> None:
         """Register a new data source."""
@@ -408,11 +680,12 @@ class DataSourceManager:
         """Get data from a specific source with optional caching."""
         
         # Check cache first
-        cache_key = f"{source_name}:{endpoint}:{hash(str(params))}"
-        if use_cache and cache_key in self.cache:
-            if datetime.now().timestamp() - self.cache_ttl[cache_key].timestamp() < cache_ttl:
-                logger.info(f"Returning cached data for {cache_key}")
-                return self.cache[cache_key]
+        cache_key = (source_name, endpoint, json.dumps(params, sort_keys=True, default=str))
+        if use_cache:
+            cached = self.cache.get(cache_key, max_age=cache_ttl)
+            if cached is not None:
+                logger.info(f"Returning cached data for {source_name}:{endpoint}")
+                return cached
         
         # Get data from source
         source = self.get_source(source_name)
@@ -423,17 +696,37 @@ class DataSourceManager:
         
         # Cache the result
         if use_cache and "error" not in data:
-            self.cache[cache_key] = data
-            self.cache_ttl[cache_key] = datetime.now()
+            self.cache.set(cache_key, data)
         
         return data
     
+    async def ahealth_check_all(self) -> Dict[str, bool]:
+        """Check health of all registered data sources concurrently."""
+        names = list(self.sources.keys())
+        results = await asyncio.gather(
+            *(self.sources[name].ahealth_check() for name in names),
+            return_exceptions=True
+        )
+        return {
+            name: False if isinstance(result, BaseException) else bool(result)
+            for name, result in zip(names, results)
+        }
+    
     def health_check_all(self) -> Dict[str, bool]:
-        """Check health of all registered data sources."""
-        results = {}
-        for name, source in self.sources.items():
-            results[name] = source.health_check()
-        return results
+        """Check health of all registered data sources concurrently in a thread pool."""
+        if not self.sources:
+            return {}
+        
+        def check(source: DataSource) -> bool:
+            try:
+                return bool(source.health_check())
+            except Exception as e:
+                logger.error(f"Health check failed for {source.config.name}: {e}")
+                return False
+        
+        # requests.Session is safe to share across threads, so checks can run in parallel
+        with ThreadPoolExecutor(max_workers=min(32, len(self.sources))) as executor:
+            return dict(zip(self.sources.keys(), executor.map(check, self.sources.values())))
     
     def create_tool_from_method(
         self,
@@ -488,27 +781,17 @@ class DataSourceManager:
                 
                 # If use_user_action is True and result doesn't already have user_action, wrap it
                 if use_user_action and isinstance(result, dict) and result.get("user_action") != True:
-                    result = {
-                        "user_action": True,
-                        "data": result,
-                        "timestamp": datetime.now().isoformat(),
-                        "source": source_name
-                    }
+                    result = DataSource._wrap_user_action(result, source_name)
                 elif use_user_action and not isinstance(result, dict):
-                    result = {
-                        "user_action": True,
-                        "data": {"result": result},
-                        "timestamp": datetime.now().isoformat(),
-                        "source": source_name
-                    }
+                    result = DataSource._wrap_user_action({"result": result}, source_name)
                 
                 # Always return as JSON string for tool compatibility
                 if isinstance(result, str):
                     return result
-                return json.dumps(result, indent=2)
+                return json_dumps(result)
             except Exception as e:
                 error_result = {"error": str(e), "source": source_name, "method": method_name}
-                return json.dumps(error_result, indent=2)
+                return json_dumps(error_result)
         
         # Generate tool name and description
         final_tool_name = tool_name or f"{source_name}_{method_name}"
@@ -548,35 +831,37 @@ class DataSourceManager:
             raise ValueError(f"Data source '{source_name}' not found")
         
         tools = []
-        
-        # Get all public methods (not starting with _)
-        for method_name in dir(source):
-            if method_name.startswith('_'):
-                continue
-            
-            method = getattr(source, method_name)
-            if not callable(method):
-                continue
-            
-            # Skip special methods and base class methods
-            if method_name in ['get', 'post', 'rpc_post', 'get_data', 'format_with_user_action', 'health_check']:
-                continue
-            
-            # Apply filter if provided
-            if method_filter and not method_filter(method_name):
-                continue
-            
-            # Create tool from this method
-            try:
-                tool = self.create_tool_from_method(
-                    source_name=source_name,
-                    method_name=method_name,
-                    use_user_action=use_user_action
-                )
-                tools.append(tool)
-            except Exception as e:
-                logger.warning(f"Failed to create tool from {source_name}.{method_name}: {e}")
-                continue
+        seen = set()
+        
+        # Get all public methods (not starting with _) defined by the datasource's own
+        # classes; walking the MRO up to DataSource leaves out the base class API
+        for cls in type(source).__mro__:
+            if cls is DataSource or not issubclass(cls, DataSource):
+                break
+            for method_name, method in cls.__dict__.items():
+                if method_name.startswith('_') or method_name in seen or not callable(method):
+                    continue
+                seen.add(method_name)
+                
+                # Skip special methods and base class methods
+                if method_name in ['get', 'post', 'rpc_post', 'get_data', 'format_with_user_action', 'health_check']:
+                    continue
+                
+                # Apply filter if provided
+                if method_filter and not method_filter(method_name):
+                    continue
+                
+                # Create tool from this method
+                try:
+                    tool = self.create_tool_from_method(
+                        source_name=source_name,
+                        method_name=method_name,
+                        use_user_action=use_user_action
+                    )
+                    tools.append(tool)
+                except Exception as e:
+                    logger.warning(f"Failed to create tool from {source_name}.{method_name}: {e}")
+                    continue
         
         return tools
 
@@ -20,11 +20,12 @@ if (packages.length > 0) {
 // Write code to file
 fs.writeFileSync('script/user_script.js', code);
 
-// Execute code
+// Execute code, passing output straight through so it can be streamed
 try {
-  const output = execSync('node script/user_script.js', { encoding: 'utf-8' });
-  console.log(output);
+  execSync('node script/user_script.js', { stdio: 'inherit' });
 } catch (err) {
-  console.error('Execution error:', err.stderr || err.message);
+  console.error('Execution error:', err.message);
+  // Report the script's failure as this runner's exit status
+  process.exitCode = err.status || 1;
 }
 
@@ -2,9 +2,14 @@
 Python runner for sandbox execution.
 """
 
-import subprocess
+import contextlib
+import importlib
+import io
+import os
+import site
 import sys
 import json
+import traceback
 
 with open("script/meta.json") as f:
     meta = json.load(f)
@@ -14,17 +19,30 @@ reqs = meta.get("requirements", [])
 
 # Install packages with suppressed warnings
 if reqs:
-    subprocess.run([
-        sys.executable, "-m", "pip", "install", 
-        "--quiet", "--no-warn-script-location", "--disable-pip-version-check"
-    ] + reqs, capture_output=True)
+    # Run pip in this interpreter instead of starting another one
+    from pip._internal.cli.main import main as pip_main
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        pip_main([
+            "install",
+            "--quiet", "--no-warn-script-location", "--disable-pip-version-check"
+        ] + reqs)
 
-# Write code to file
+# Write code to file (tracebacks read source lines from it)
 with open("script/user_script.py", "w") as f:
     f.write(code)
 
-# Execute code
-result = subprocess.run(["python", "script/user_script.py"], capture_output=True, text=True)
-print(result.stdout)
-print(result.stderr, file=sys.stderr)
+# Execute code in this interpreter; the container is the isolation boundary.
+# Packages installed above may have created the user site dir after startup.
+user_site = site.getusersitepackages()
+if os.path.isdir(user_site) and user_site not in sys.path:
+    site.addsitedir(user_site)
+importlib.invalidate_caches()
 
+sys.argv = ["script/user_script.py"]
+sys.stdout.reconfigure(line_buffering=True)
+try:
+    exec(compile(code, "script/user_script.py", "exec"), {"__name__": "__main__", "__file__": "script/user_script.py"})
+except Exception as e:
+    # Drop the runner's own frame so the traceback matches running the script directly
+    traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    sys.exit(1)
@@ -1,50 +1,272 @@
 """
 Sandbox server for executing code in isolated Docker containers.
+
+A pool of warm containers is started per language and jobs are run in them
+with `docker exec`, so requests do not pay container startup. Each container
+has its own script directory mounted and runs one job; it is then replaced by
+a fresh container in the background, so nothing a job leaves behind (files,
+installed packages, processes) is visible to later jobs.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import uuid
+import asyncio
 import os
-import subprocess
+import shutil
 import json
-
-app = FastAPI()
+import uuid
 
 BASE_DIR = "/tmp/exec_sandbox"
 os.makedirs(BASE_DIR, exist_ok=True)
 
+# Number of warm containers kept per language (0 disables pooling)
+POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", "4"))
+# Max throwaway containers running at once when no warm pool is available
+MAX_CONCURRENT_CONTAINERS = int(os.getenv("SANDBOX_MAX_CONCURRENT", "8"))
+
+DOCKER_LIMITS = ["--memory=256m", "--cpus=0.5"]
+
+# language -> (image, runner command inside the container)
+LANGUAGES = {
+    "python": ("sandbox-python", ["python", "runner.py"]),
+    "node": ("sandbox-node", ["node", "runner.js"]),
+}
+
+# language -> queue of idle warm container names; None in a queue means the
+# pool has no working containers left and jobs should use throwaway ones
+_pools: dict[str, asyncio.Queue] = {}
+# language -> number of warm containers still in rotation (idle, busy or recycling)
+_pool_sizes: dict[str, int] = {}
+# Background tasks replacing used warm containers
+_recycling: set[asyncio.Task] = set()
+
+# Reusable script directories for throwaway containers; also caps how many run at once
+_cold_slots: asyncio.Queue = asyncio.Queue()
+for _i in range(MAX_CONCURRENT_CONTAINERS):
+    _slot_dir = os.path.join(BASE_DIR, f"slot_{_i}")
+    os.makedirs(_slot_dir, exist_ok=True)
+    # Set permissions so the sandbox user can write to the directory
+    os.chmod(_slot_dir, 0o777)
+    _cold_slots.put_nowait(_slot_dir)
+
+
+def _container_dir(name: str) -> str:
+    return os.path.join(BASE_DIR, name)
+
+
+async def _docker(*args: str) -> tuple[int, str, str]:
+    """Run a docker CLI command without blocking the event loop."""
+    proc = await asyncio.create_subprocess_exec(
+        "docker", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def _start_container(language: str, name: str) -> bool:
+    """Start (or restart) a warm container that idles until jobs are exec'd into it."""
+    image, _ = LANGUAGES[language]
+    script_dir = _container_dir(name)
+    await asyncio.to_thread(shutil.rmtree, script_dir, ignore_errors=True)
+    os.makedirs(script_dir, exist_ok=True)
+    # Set permissions so the sandbox user can write to the directory
+    os.chmod(script_dir, 0o777)
+
+    try:
+        await _docker("rm", "-f", name)
+        returncode, _, stderr = await _docker(
+            "run", "-d", "--name", name,
+            *DOCKER_LIMITS,
+            "-v", f"{script_dir}:/home/sandbox/script",
+            image, "sleep", "infinity"
+        )
+    except OSError as e:
+        print(f"Failed to start warm container {name}: {e}")
+        return False
+    if returncode != 0:
+        print(f"Failed to start warm container {name}: {stderr.strip()}")
+        return False
+    return True
+
+
+def _reset_script_dir(script_dir: str) -> None:
+    """Remove files left by the previous job in a script directory."""
+    for entry in os.listdir(script_dir):
+        path = os.path.join(script_dir, entry)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+
+async def _recycle(language: str, name: str, pool: asyncio.Queue) -> None:
+    """Replace a used warm container with a fresh one and return it to the pool."""
+    if await _start_container(language, name):
+        pool.put_nowait(name)
+        return
+    print(f"Dropping warm container {name} from the {language} pool")
+    _pool_sizes[language] -= 1
+    if _pool_sizes[language] == 0:
+        # Later jobs use throwaway containers; wake any job already waiting on the pool
+        _pools.pop(language, None)
+        pool.put_nowait(None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    names = {language: [f"sandbox-{language}-{i}" for i in range(POOL_SIZE)] for language in LANGUAGES}
+    for language in LANGUAGES:
+        started = await asyncio.gather(*(_start_container(language, name) for name in names[language]))
+        pool = asyncio.Queue()
+        for name, ok in zip(names[language], started):
+            if ok:
+                pool.put_nowait(name)
+        if not pool.empty():
+            _pools[language] = pool
+            _pool_sizes[language] = pool.qsize()
+    yield
+    for task in list(_recycling):
+        task.cancel()
+    await asyncio.gather(*_recycling, return_exceptions=True)
+    _pools.clear()
+    _pool_sizes.clear()
+    for language_names in names.values():
+        for name in language_names:
+            await _docker("rm", "-f", name)
+
+
+app = FastAPI(lifespan=lifespan)
+
 class ScriptRequest(BaseModel):
     code: str
     requirements: list[str] = []
     language: str = "python"  # or "node"
 
+
+@asynccontextmanager
+async def _job(language: str, meta: dict):
+    """
+    Reserve a container for a job and yield the docker arguments that run it.
+
+    Uses an idle warm container when the language has a pool, otherwise a
+    throwaway container. A warm container is replaced after every job.
+    Callers set job["abandoned"] when they stop waiting for the job, so a
+    throwaway container is removed before its script directory is reused.
+    """
+    pool = _pools.get(language)
+    image, command = LANGUAGES[language]
+    name = await pool.get() if pool is not None else None
+
+    if name is None:
+        if pool is not None:
+            # The pool has been emptied; pass the marker on to the next waiting job
+            pool.put_nowait(None)
+        script_dir = await _cold_slots.get()
+        name = f"sandbox-job-{uuid.uuid4().hex}"
+        job = {
+            "args": ["run", "--rm", "--name", name, *DOCKER_LIMITS, "-v", f"{script_dir}:/home/sandbox/script", image],
+            "abandoned": False
+        }
+        try:
+            _reset_script_dir(script_dir)
+            with open(os.path.join(script_dir, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            yield job
+        finally:
+            if job["abandoned"]:
+                await _docker("rm", "-f", name)
+            _cold_slots.put_nowait(script_dir)
+        return
+
+    try:
+        # The container is fresh, so only this job's files are in its script dir
+        with open(os.path.join(_container_dir(name), "meta.json"), "w") as f:
+            json.dump(meta, f)
+        # Recycling removes the container, stopping anything still running in it
+        yield {"args": ["exec", name, *command], "abandoned": False}
+    finally:
+        task = asyncio.create_task(_recycle(language, name, pool))
+        _recycling.add(task)
+        task.add_done_callback(_recycling.discard)
+
+
+async def _read_lines(proc: asyncio.subprocess.Process):
+    """Yield (stream, line) pairs from a process's stdout and stderr as they arrive."""
+    # Bounded so a slow client applies backpressure instead of buffering output
+    lines: asyncio.Queue = asyncio.Queue(maxsize=100)
+
+    async def pump(stream: str, reader: asyncio.StreamReader) -> None:
+        async for line in reader:
+            await lines.put((stream, line.decode(errors="replace").rstrip("\n")))
+        await lines.put(None)
+
+    pumps = [
+        asyncio.create_task(pump("stdout", proc.stdout)),
+        asyncio.create_task(pump("stderr", proc.stderr)),
+    ]
+    try:
+        open_streams = len(pumps)
+        while open_streams:
+            item = await lines.get()
+            if item is None:
+                open_streams -= 1
+            else:
+                yield item
+    finally:
+        for task in pumps:
+            task.cancel()
+
+
 @app.post("/run")
-def run_script(body: ScriptRequest):
-    uid = str(uuid.uuid4())
-    script_dir = os.path.join(BASE_DIR, uid)
-    os.makedirs(script_dir, exist_ok=True)
-    
-    # Set permissions so the sandbox user can write to the directory
-    os.chmod(script_dir, 0o777)
+async def run_script(body: ScriptRequest):
+    language = "node" if body.language == "node" else "python"
+
+    async with _job(language, body.dict()) as job:
+        try:
+            returncode, stdout, stderr = await _docker(*job["args"])
+        except asyncio.CancelledError:
+            job["abandoned"] = True
+            raise
+
+    print(stdout)
+    print(stderr)
+    return {"stdout": stdout, "stderr": stderr}
+
+
+@app.post("/run/stream")
+async def run_script_stream(body: ScriptRequest):
+    """
+    Run a script and stream its output as newline-delimited JSON.
+
+    Emits {"stream": "stdout"|"stderr", "line": ...} per output line, then
+    {"exit_code": ...}. Disconnecting stops the job.
+    """
+    language = "node" if body.language == "node" else "python"
+    meta = body.dict()
 
-    with open(os.path.join(script_dir, "meta.json"), "w") as f:
-        json.dump(body.dict(), f)
-
-    if body.language == "node":
-        image = "sandbox-node"
-        runner = "runner.js"
-    else:
-        image = "sandbox-python"
-        runner = "runner.py"
-
-    result = subprocess.run([
-        "docker", "run", "--rm",
-        "--memory=256m", "--cpus=0.5",
-        "-v", f"{script_dir}:/home/sandbox/script",
-        image
-    ], capture_output=True, text=True)
-    print(result.stdout)
-    print(result.stderr)
-    return {"stdout": result.stdout, "stderr": result.stderr}
+    async def events():
+        async with _job(language, meta) as job:
+            proc = await asyncio.create_subprocess_exec(
+                "docker", *job["args"],
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=1 << 20
+            )
+            try:
+                async for stream, line in _read_lines(proc):
+                    yield json.dumps({"stream": stream, "line": line}) + "\n"
+                await proc.wait()
+                yield json.dumps({"exit_code": proc.returncode}) + "\n"
+            finally:
+                if proc.returncode is None:
+                    # Client went away mid-job; stopping the docker CLI does not
+                    # stop the container, so _job removes it
+                    proc.terminate()
+                    await proc.wait()
+                    job["abandoned"] = True
 
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -3,30 +3,39 @@ from langchain_core.messages import ToolMessage, AIMessage
 from langchain_core.runnables import Runnable
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.caches import InMemoryCache
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 import os
 from deepsense.utils.token_utils import estimate_token_count, chunk_data_by_tokens
-from typing import TypedDict, List, Dict, Any
-import json
-import copy
+from typing import TypedDict, List, Dict, Any, Annotated, Deque
+from collections import deque
+import operator
 import uuid
 from langchain_google_genai import ChatGoogleGenerativeAI
 from deepsense.utils.s3_utils import upload_json_to_s3
+from deepsense.utils.async_utils import run_sync
+from deepsense.utils.json_utils import json_dumps, json_loads
+from langchain_core.utils.json import parse_json_markdown
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import logging
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
 
 # ---- STATE TYPE ----
 
 class SchemaDiscoveryState(TypedDict, total=False):
-    pending_chunks: List[str]   
+    pending_chunks: Deque[str]           # Consumed from the left, one chunk per schema step
     current_chunk : str    
     current_chunks : List[str] 
     parallel_chunks : List[List[str]]    # Raw JSON chunks (as strings)
-    partial_schemas: List[dict]          # Intermediate schema JSONs
+    partial_schemas: Annotated[List[dict], operator.add]  # Intermediate schema JSONs (nodes return new items)
     final_schema: dict    
     final_summary: str 
-    summaries : List[str]
+    summaries : Annotated[List[str], operator.add]        # Nodes return new summaries to append
      # Final schema output
     count:int
     ai_message_context: str              # Full context from the latest AI message
@@ -41,21 +50,35 @@ class SchemaDiscoveryState(TypedDict, total=False):
 #         temperature=0,
 #         anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
 #     )
-model = ChatGoogleGenerativeAI(
-    model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite"),
-    temperature=0,
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
-model_2=ChatGoogleGenerativeAI(
-    model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
-    temperature=0,
-    google_api_key=os.getenv("GEMINI_API_KEY")
-)
-openai_model = ChatOpenAI(
-    model=os.getenv("OPENAI_MODEL", "gpt-4o"),
-    temperature=0,
-    openai_api_key=os.getenv("OPENAI_API_KEY")
-)
+
+# Response cache for the summarizer models only (not installed globally, so the agent's
+# own model is unaffected). Calls are temperature 0, so a repeated prompt -- e.g. a
+# recurring chunk or a retried tool call -- can reuse the earlier answer.
+llm_cache = InMemoryCache(maxsize=1024)
+
+# Clients are built on first use rather than at import, and then shared by every chain
+@lru_cache(maxsize=1)
+def get_model() -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite"),
+        temperature=0,
+        google_api_key=os.getenv("GEMINI_API_KEY"),
+        timeout=30,
+        max_retries=2,
+        cache=llm_cache
+    )
+
+@lru_cache(maxsize=1)
+def get_openai_model() -> ChatOpenAI:
+    return ChatOpenAI(
+        model=os.getenv("OPENAI_MODEL", "gpt-4o"),
+        temperature=0,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        timeout=30,
+        max_retries=2,
+        cache=llm_cache
+    )
+
 # Decision prompt for choosing between schema discovery and summarization
 decision_prompt = ChatPromptTemplate.from_messages([
     ("system", "You are an AI assistant that analyzes user queries and AI message context to determine the best processing approach."),
@@ -78,10 +101,13 @@ Return JSON with:
 """)
 ])
 
+# Prompts keep static instructions first and per-call data last, so providers that
+# cache prompt prefixes can reuse the shared part across chunks of one run.
+
 # Schema discovery prompt (existing)
 prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are a data structure analyzer."),
-    ("human", """
+    ("system", """You are a data structure analyzer.
+
 Given a chunk of structured data (usually JSON / JSON STRINGIFIED /ARRAY OF JSON OBJECTS), return:
 
 1. `"format"` — e.g., "list of JSON objects", "newline-delimited JSON", "CSV-like", "stringified JSON", etc.
@@ -97,10 +123,10 @@ Output JSON **only** like this:
   
 }}
 ```
-Given a chunk of structured data (usually JSON), return:
 
-- If a partial schema from previous chunks is provided, use it as context and extend or update it as needed.
-- Here is the partial schema from previous chunks (if any):
+- If a partial schema from previous chunks is provided, use it as context and extend or update it as needed."""),
+    ("human", """
+Here is the partial schema from previous chunks (if any):
 {partial_schema}
 
 {chunk}
@@ -110,17 +136,9 @@ Given a chunk of structured data (usually JSON), return:
 # Summarization prompt
 summarize_prompt = ChatPromptTemplate.from_messages([
     ("system", 
-"You are a summarizer that processes partial or complete tool outputs, often in JSON or plain text."),
-    ("human",
-"""
-The tool was called to address the user query below. You are given a data chunk which may be malformed or incomplete due to chunking.
-
-Input:
-- Purpose of the data: {ai_message_context}
-- Previous Summary if any: {previous_summary}
--Suggestions for summarization: {llm_suggestions}
-
+"""You are a summarizer that processes partial or complete tool outputs, often in JSON or plain text.
 
+The tool was called for the purpose given below. You are given a data chunk which may be malformed or incomplete due to chunking.
 
 Instructions:
 1. When summarizing, always preserve numeric values exactly as written.Do not round, rephrase, or approximate decimals.
@@ -130,19 +148,85 @@ Instructions:
 5. Only add **new** information; do not re-summarize previous content.
 6. If nothing useful is found, return an empty JSON object: {{}}.
 
+Output:
+- Valid JSON if possible.
+- Minimal, concise, only new info."""),
+    ("system",
+"""Input:
+- Purpose of the data: {ai_message_context}
+- Suggestions for summarization: {llm_suggestions}"""),
+    ("human",
+"""
+Previous Summary if any: {previous_summary}
+
 Chunk:
 {chunk}
+""")
+])
 
-Output:
-- Valid JSON if possible.
-- Minimal, concise, only new info.
+# Merger prompts: intermediate (per group) and final
+batch_merger_prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are an assistant that merges partial summaries into a single intermediate summary."),
+    ("human", """
+Combine the following partial summaries into one concise *intermediate summary*.
+- When summarizing, always preserve numeric values exactly as written. 
+- Do NOT draw conclusions
+- Do NOT polish or finalize
+- Preserve structure and key details for the next stage
+
+Context:
+- Purpose: {ai_message_context}
+- Suggestions: {llm_suggestions}
+
+{partial_summaries}
+"""),
+])
+merger_prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert at combining and synthesizing multiple partial summaries into a comprehensive, coherent final summary."),
+    ("human", """
+ Combine and refine the following partial summaries into one cohesive summary .
+
+Context:
+- Purpose: {ai_message_context}
+- Suggestions: {llm_suggestions}
+
+Partial summaries to merge:
+{partial_summaries}
+
+Instructions:
+- When summarizing, always preserve numeric values exactly as written. 
+Do not round, rephrase, or approximate decimals.
+- use purpose context and suggestions to Combine related information from different summaries
+- Remove duplicate information
+- Ensure the final summary is well-structured based on the purpose and suggestions
+- Maintain the key insights and findings from all partial summaries
+- If there are conflicting details, note them appropriately
+
+Return a comprehensive final summary that covers all the important information from the partial summaries.
 """)
 ])
 
 
-llm_chain: Runnable = prompt | model | JsonOutputParser()
-decision_chain: Runnable = decision_prompt | openai_model | JsonOutputParser()
-summarize_chain: Runnable = summarize_prompt | model | JsonOutputParser()
+@lru_cache(maxsize=1)
+def get_llm_chain() -> Runnable:
+    return prompt | get_model() | JsonOutputParser()
+
+@lru_cache(maxsize=1)
+def get_decision_chain() -> Runnable:
+    return decision_prompt | get_openai_model() | JsonOutputParser()
+
+@lru_cache(maxsize=1)
+def get_summarize_chain() -> Runnable:
+    # No output parser: responses are streamed and parsed by astream_json
+    return summarize_prompt | get_model()
+
+@lru_cache(maxsize=1)
+def get_batch_merger_chain() -> Runnable:
+    return batch_merger_prompt | get_model()
+
+@lru_cache(maxsize=1)
+def get_final_merger_chain() -> Runnable:
+    return merger_prompt | get_model()
 
 # ---- NODES ----
 
@@ -151,8 +235,7 @@ def get_latest_ai_message_context(agent_state: dict) -> str:
     latest_ai_message = agent_state.get("latest_ai_message")
     tool_output = agent_state.get("tool_output")
     
-    print('------latest_ai_message------')
-    print(latest_ai_message)
+    logger.debug("latest_ai_message: %s", latest_ai_message)
    
     if latest_ai_message and tool_output:
         # Get tool ID from tool output
@@ -168,63 +251,126 @@ def get_latest_ai_message_context(agent_state: dict) -> str:
                     args =tool_call.get('args')
                  
                     if "reason" in args:
-                        print('------reason------')
-                        print(args["reason"])
+                        logger.debug("tool call reason: %s", args["reason"])
                         return args["reason"]
                 except Exception as e:
-                    print(f"Error in tool call args: {e}")
+                    logger.error("Error in tool call args: %s", e)
                     
                     
     return ""
 
-def decide_processing_mode(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
-    """Decide whether to do schema discovery or summarization based on the AI message context."""
+# Words in the tool call reason that make the mode obvious without asking the LLM
+SUMMARIZE_KEYWORDS = {"summary", "summarize", "list", "overview", "insight", "insights", "describe"}
+SCHEMA_KEYWORDS = {"schema", "structure", "analyze", "explore", "fields"}
+PROCESSING_MODES = ("schema", "summarize")
+
+def mode_from_context(ai_message_context: str) -> str:
+    """
+    Pick the processing mode from keywords in the AI message context.
+
+    Returns "summarize" or "schema" when only one keyword set matches, or ""
+    when the context is empty or ambiguous and the LLM should decide.
+    """
+    words = set(re.findall(r"[a-z]+", ai_message_context.lower()))
+    summarize = not words.isdisjoint(SUMMARIZE_KEYWORDS)
+    schema = not words.isdisjoint(SCHEMA_KEYWORDS)
+    if summarize != schema:
+        return "summarize" if summarize else "schema"
+    return ""
+
+async def decide_processing_mode(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
+    """
+    Decide whether to do schema discovery or summarization based on the AI message context.
+
+    While the decision LLM runs, the first schema step is started speculatively
+    (its input does not depend on the decision) and kept if schema mode wins.
+    """
     ai_message_context = state.get("ai_message_context", "")
     # user_query = state.get("user_query", "")
+
+    # Skip the decision LLM call when the intent is obvious from the context
+    processing_mode = mode_from_context(ai_message_context)
+    if processing_mode:
+        logger.info("[DECISION] Mode: %s (keyword match)", processing_mode)
+        return {"processing_mode": processing_mode, "llm_suggestions": []}
     
     # Get first chunk safely
     pending_chunks = state.get("pending_chunks", [])
     first_chunk = pending_chunks[0] if len(pending_chunks) > 0 else ""
     
+    schema_task = None
+    if first_chunk:
+        schema_task = asyncio.ensure_future(
+            get_llm_chain().ainvoke({"chunk": first_chunk, "partial_schema": {}})
+        )
+
     # Make decision using LLM
-    decision_result = decision_chain.invoke({
-        # "user_query": user_query,
-        "ai_message_context": ai_message_context,
-        "chunk": first_chunk
-    })
+    try:
+        decision_result = await get_decision_chain().ainvoke({
+            # "user_query": user_query,
+            "ai_message_context": ai_message_context,
+            "chunk": first_chunk
+        })
+    except BaseException:
+        if schema_task is not None:
+            schema_task.cancel()
+        raise
     
-    state["processing_mode"] = decision_result.get("mode", "schema")
-    state["llm_suggestions"] = decision_result.get("suggestions", [])
+    processing_mode = decision_result.get("mode", "schema")
+    llm_suggestions = decision_result.get("suggestions", [])
     
-    print(f"[DECISION] Mode: {state['processing_mode']}")
-    print(f"[DECISION] Reasoning: {decision_result.get('reasoning', '')}")
-    print(f"[DECISION] Suggestions: {state['llm_suggestions']}")
+    logger.info("[DECISION] Mode: %s", processing_mode)
+    logger.debug("[DECISION] Reasoning: %s", decision_result.get('reasoning', ''))
+    logger.debug("[DECISION] Suggestions: %s", llm_suggestions)
     
-    return state
+    # Return only the updated keys; LangGraph merges them into the state
+    decision = {"processing_mode": processing_mode, "llm_suggestions": llm_suggestions}
+    if schema_task is None:
+        return decision
+    if processing_mode != "schema":
+        schema_task.cancel()
+        return decision
 
-def next_chunk(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
-    new_state = copy.deepcopy(state)
+    try:
+        result = await schema_task
+    except Exception as e:
+        # The first chunk stays pending and is processed by the normal schema step
+        logger.warning("Speculative schema step failed, retrying in graph: %s", e)
+        return decision
+    pending_chunks.popleft()
+    logger.debug("Kept speculative schema result for the first chunk")
+    return {
+        **decision,
+        "partial_schemas": [result],
+        "pending_chunks": pending_chunks,
+        "count": state.get("count", 0) + 1
+    }
 
-    if new_state["pending_chunks"]:
-        if new_state['processing_mode'] == "summarize":
+def next_chunk(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
+    # Only the keys set here are returned; pending_chunks is a deque consumed in place (never copied)
+    new_state = {}
+    pending = state["pending_chunks"]
+
+    if len(pending) > 0:
+        if state['processing_mode'] == "summarize":
+            chunks = list(pending)
+            pending.clear()
             new_state["current_chunks"] = []
-            if new_state["pending_chunks"]:
-
-                new_state["parallel_chunks"] = [new_state["pending_chunks"][i:i + 8] for i in range(0, len(new_state["pending_chunks"]), 8)]
-            new_state["pending_chunks"] = []
+            new_state["parallel_chunks"] = [chunks[i:i + 8] for i in range(0, len(chunks), 8)]
+            new_state["pending_chunks"] = pending
             # for _ in range(0,8):
             #     if new_state["pending_chunks"]:
             #         new_state["current_chunks"].append(new_state["pending_chunks"].pop(0)) 
-            print(f"Popped {len(new_state['parallel_chunks'])} chunks from pending_chunks")
-            print(f"Remaining pending chunks: {len(new_state['pending_chunks'])}")
+            logger.debug("Grouped %d pending chunks into %d groups", len(chunks), len(new_state['parallel_chunks']))
         else:    
-            new_state["current_chunk"] = new_state["pending_chunks"].pop(0)
-            print("current chunk", len(new_state["current_chunk"]))
+            new_state["current_chunk"] = pending.popleft()
+            new_state["pending_chunks"] = pending
+            logger.debug("current chunk %d chars", len(new_state["current_chunk"]))
             
         # If we have LLM suggestions, apply them to the current chunk
         # if new_state.get("llm_suggestions"):
         #     suggestions = new_state["llm_suggestions"]
-        #     print(f"[NEXT_CHUNK] Applying suggestions: {suggestions}")
+        #     logger.debug("[NEXT_CHUNK] Applying suggestions: %s", suggestions)
             
         #     # You can add logic here to modify the chunk based on suggestions
         #     # For now, we'll just log them
@@ -232,23 +378,27 @@ def next_chunk(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
     
     return new_state
 
-def schema_from_chunks(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
+async def schema_from_chunks(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
    
     
     # Check if we should do schema discovery or summarization
     processing_mode = state.get("processing_mode", "schema")
-    print(f"Processing mode: {processing_mode}")
+    logger.debug("Processing mode: %s", processing_mode)
     
     if processing_mode == "schema":
-        chunk = state["current_chunk"]
-        print("chunk", len(chunk))
+        chunk = state.get("current_chunk")
+        if chunk is None:
+            # Tool output produced no chunks; nothing to discover
+            return {}
+        logger.debug("chunk %d chars", len(chunk))
         # Original schema discovery logic
         partial_schemas = state.get("partial_schemas", [])
         partial_schema = partial_schemas[-1] if len(partial_schemas) > 0 else {}
         
-        result = llm_chain.invoke({"chunk": chunk, "partial_schema": partial_schema})
-        state.setdefault("partial_schemas", []).append(result)
-        print(f"Added schema result, total schemas: {len(state.get('partial_schemas', []))}")
+        result = await get_llm_chain().ainvoke({"chunk": chunk, "partial_schema": partial_schema})
+        logger.debug("Added schema result, total schemas: %d", len(partial_schemas) + 1)
+        # partial_schemas has an append reducer, so only the new item is returned
+        return {"partial_schemas": [result], "count": state["count"] + 1}
     else:
         parallel_chunks = state.get("parallel_chunks", [])
 
@@ -256,8 +406,7 @@ def schema_from_chunks(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
         # Summarization logic
         ai_message_context = state.get("ai_message_context", "")
         # user_query = state.get("user_query", "")
-        print(ai_message_context)
-        # print(user_query)
+        # logger.debug("user_query: %s", user_query)
         # Get previous summary safely
         summaries = state.get("summaries", [])
         previous_summary = summaries[-1] if len(summaries) > 0 else ""
@@ -266,10 +415,11 @@ def schema_from_chunks(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
         llm_suggestions = state.get("llm_suggestions", [])
         current_suggestion = '\n\n'.join(llm_suggestions) if len(llm_suggestions) > 0 else ''
         
-        print(f"Summarizing chunk, previous summaries: {len(summaries)}")
+        logger.debug("Summarizing chunks, previous summaries: %d", len(summaries))
         
         
         
+        new_summaries = []
         try:
             # summarize_result = summarize_chain.invoke({
             #     "chunk": chunk,
@@ -280,151 +430,203 @@ def schema_from_chunks(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
             # })
 
             
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                futures = [executor.submit(parallel_summarize, c,ai_message_context,current_suggestion) for c in parallel_chunks]
-                for future in as_completed(futures):
-                    summaries += future.result()
-                    # summarize_result = parallel_summarize(chunks, ai_message_context, current_suggestion)
-            # for c in summarize_result:
-            state["summaries"]=summaries
+            new_summaries = await parallel_summarize(parallel_chunks, ai_message_context, current_suggestion)
 
 
         except Exception as e:
-            print(f"Error in summarization chain: {e}")
+            logger.error("Error in summarization chain: %s", e)
             # Create a fallback summary
            
         # state.setdefault("summaries", []).append(json.dumps(summarize_result))
-        print(f"Added summary result, total summaries: {len(state.get('summaries', []))}")
-    
-    state["count"] += 1
-    return state
+        logger.debug("Added summary result, total summaries: %d", len(summaries) + len(new_summaries))
+        # summaries has an append reducer, so only the new items are returned
+        return {"summaries": new_summaries, "count": state["count"] + 1}
+# A response that is only an empty object ("nothing useful found"), possibly fenced
+EMPTY_JSON_RESPONSE = re.compile(r"(?:```(?:json)?\s*)?\{\s*\}")
+JSON_OBJECT_SLICE = re.compile(r"\{.*\}", re.DOTALL)
+
+def _message_text(content) -> str:
+    """Text of a message's content, which may be a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+def parse_json_output(text: str):
+    """
+    Parse an LLM response as JSON, tolerating markdown fences and surrounding prose.
+
+    Falls back to the outermost {...} slice, then to the raw text, instead of raising.
+    """
+    try:
+        return parse_json_markdown(text)
+    except ValueError:
+        pass
+    match = JSON_OBJECT_SLICE.search(text)
+    if match:
+        try:
+            return json_loads(match.group(0))
+        except ValueError:
+            pass
+    logger.warning("LLM response is not valid JSON, using raw text (%d chars)", len(text))
+    return text.strip()
+
+async def astream_json(chain: Runnable, inputs: dict):
+    """
+    Stream a chat model response and parse it as JSON.
+
+    Stops reading as soon as the response is an empty object, so the model is not
+    kept generating (e.g. trailing fences) for chunks with nothing useful in them.
+    """
+    parts = []
+    async for message_chunk in chain.astream(inputs):
+        parts.append(_message_text(message_chunk.content))
+        if EMPTY_JSON_RESPONSE.fullmatch("".join(parts).strip()):
+            # Leaving the loop closes the stream and its connection
+            return {}
+    return parse_json_output("".join(parts))
+
 def batch_summarize(chunks):
-    return summarize_chain.batch(chunks)
+    return [parse_json_output(_message_text(message.content)) for message in get_summarize_chain().batch(chunks)]
 
 def summarize_chunk(chunk, ai_message_context, current_suggestion):
-    return summarize_chain.invoke({
+    message = get_summarize_chain().invoke({
                 "chunk": chunk,
                 "ai_message_context": ai_message_context,
                 # "user_query": user_query,
                 "llm_suggestions": current_suggestion,
                 "previous_summary": "",
             })
+    return parse_json_output(_message_text(message.content))
 
-def parallel_summarize(chunks, ai_message_context,current_suggestion, batch_size=8):
-    summaries = []
-    batch_summaries = []
-    # with ThreadPoolExecutor(max_workers=batch_size) as executor:
-    chunks_json=[]
-    for c in chunks:
-        chunks_json.append({
-                "chunk": c,
-                "ai_message_context": ai_message_context,
-                # "user_query": user_query,
-                "llm_suggestions": current_suggestion,
-                "previous_summary": "",
-            })
-    batch_summaries = summarize_chain.batch(chunks_json,config={"max_concurrency": 10})
-    batch_summaries_json = [json.dumps(summary) for summary in batch_summaries]
- 
-    #     futures = [executor.submit(summarize_chunk, c,ai_message_context,current_suggestion) for c in chunks]
-    #     for future in as_completed(futures):
-    #         batch_summaries.append(json.dumps(future.result()))
-    merged_summary = merge_summaries(batch_summaries_json, ai_message_context,current_suggestion ,batch=True)
-    summaries.append(merged_summary)
-    return summaries
-
-def merge_summaries(summaries, ai_message_context,current_suggestion,batch =False):
-    batch_merger_prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are an assistant that merges partial summaries into a single intermediate summary."),
-    ("human", """
-Combine the following partial summaries into one concise *intermediate summary*.
-- When summarizing, always preserve numeric values exactly as written. 
-- Do NOT draw conclusions
-- Do NOT polish or finalize
-- Preserve structure and key details for the next stage
-
-Context:
-- Purpose: {ai_message_context}
-- Suggestions: {llm_suggestions}
-
-{partial_summaries}
-"""),
-])
-    merger_prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are an expert at combining and synthesizing multiple partial summaries into a comprehensive, coherent final summary."),
-                ("human", """
- Combine and refine the following partial summaries into one cohesive summary .
-
-Context:
-- Purpose: {ai_message_context}
-- Suggestions: {llm_suggestions}
-
-Partial summaries to merge:
-{partial_summaries}
-
-Instructions:
-- When summarizing, always preserve numeric values exactly as written. 
-Do not round, rephrase, or approximate decimals.
-- use purpose context and suggestions to Combine related information from different summaries
-- Remove duplicate information
-- Ensure the final summary is well-structured based on the purpose and suggestions
-- Maintain the key insights and findings from all partial summaries
-- If there are conflicting details, note them appropriately
+async def parallel_summarize(parallel_chunks, ai_message_context, current_suggestion, max_concurrency=32):
+    """
+    Summarize every chunk of every group concurrently and merge each group into
+    an intermediate summary as soon as its own chunks are done, so group merges
+    overlap with summarization still in flight. Returns one summary per group.
 
-Return a comprehensive final summary that covers all the important information from the partial summaries.
-""")
-            ])
-            
-            # Create the merger chain
-    if batch:
-        merger_chain = batch_merger_prompt | model #| JsonOutputParser()
-    else:
-        merger_chain = merger_prompt | model#| JsonOutputParser()
+    With a single group, its chunk summaries are returned unmerged; the final
+    merge in merge_and_emit_tool_message combines them in one pass instead.
+    """
+    base_input = {
+        "ai_message_context": ai_message_context,
+        # "user_query": user_query,
+        "llm_suggestions": current_suggestion,
+        "previous_summary": "",
+    }
+    # Caps in-flight summarize calls across all groups
+    semaphore = asyncio.Semaphore(max_concurrency)
+    chunk_tasks: Dict[str, asyncio.Task] = {}
+
+    async def summarize(chunk):
+        async with semaphore:
+            summary = await astream_json(get_summarize_chain(), {**base_input, "chunk": chunk})
+        # The merger only reads this as text: compact JSON, no ASCII escaping, strings as-is
+        if isinstance(summary, (dict, list)):
+            return json_dumps(summary)
+        return str(summary)
+
+    def summary_task(chunk):
+        # Identical chunks (repeated boilerplate blocks) share one LLM call
+        if chunk not in chunk_tasks:
+            chunk_tasks[chunk] = asyncio.ensure_future(summarize(chunk))
+        return chunk_tasks[chunk]
+
+    single_group = len(parallel_chunks) == 1
+    if single_group:
+        logger.info("[SUMMARIZE] Single group of %d chunks, skipping intermediate merge", len(parallel_chunks[0]))
+
+    async def process_group(group):
+        group_summaries = await asyncio.gather(*(summary_task(c) for c in group))
+        if single_group:
+            return list(group_summaries)
+        return await amerge_summaries(list(group_summaries), ai_message_context, current_suggestion, batch=True)
+
+    group_tasks = [asyncio.ensure_future(process_group(group)) for group in parallel_chunks]
+    try:
+        results = list(await asyncio.gather(*group_tasks))
+        return results[0] if single_group else results
+    finally:
+        # On failure, don't leave sibling LLM calls running
+        for task in [*group_tasks, *chunk_tasks.values()]:
+            task.cancel()
+        total_chunks = sum(len(group) for group in parallel_chunks)
+        if len(chunk_tasks) < total_chunks:
+            logger.debug("Skipped %d duplicate chunks", total_chunks - len(chunk_tasks))
+
+def _build_merger(summaries, ai_message_context, current_suggestion, batch=False):
+    merger_chain = get_batch_merger_chain() if batch else get_final_merger_chain()
             
             # Join partial summaries with clear separators
     partial_summaries_text = "\n\n--- PARTIAL SUMMARY ---\n\n".join(summaries)
-            
-    print(f"Merging {len(summaries)} partial summaries...")
+    return merger_chain, {
+        "partial_summaries": partial_summaries_text,
+        "ai_message_context": ai_message_context,
+        "llm_suggestions": current_suggestion
+    }
+
+def merge_summaries(summaries, ai_message_context,current_suggestion,batch =False):
+    if len(summaries) == 1:
+        # Nothing to merge; skip the LLM call
+        return summaries[0]
+    merger_chain, merger_input = _build_merger(summaries, ai_message_context, current_suggestion, batch)
+    logger.debug("Merging %d partial summaries", len(summaries))
             
     try:
         # Invoke the merger chain
-        merged_result = merger_chain.invoke({
-            "partial_summaries": partial_summaries_text,
-            "ai_message_context": ai_message_context,
-            "llm_suggestions": current_suggestion
-        })
+        merged_result = merger_chain.invoke(merger_input)
         
         final_summary = merged_result.content
-        print("merged_summary------------", final_summary)
+        logger.debug("Merged summary: %d chars", len(final_summary))
         return final_summary
     except Exception as e:
-        print(f"Error merging summaries: {e}")
+        logger.error("Error merging summaries: %s", e)
+        return f"Error merging summaries : {e}"
+
+async def amerge_summaries(summaries, ai_message_context, current_suggestion, batch=False):
+    """Async version of merge_summaries."""
+    if len(summaries) == 1:
+        # Nothing to merge; skip the LLM call
+        return summaries[0]
+    merger_chain, merger_input = _build_merger(summaries, ai_message_context, current_suggestion, batch)
+    logger.debug("Merging %d partial summaries", len(summaries))
+
+    try:
+        merged_result = await merger_chain.ainvoke(merger_input)
+        final_summary = merged_result.content
+        logger.debug("Merged summary: %d chars", len(final_summary))
+        return final_summary
+    except Exception as e:
+        logger.error("Error merging summaries: %s", e)
         return f"Error merging summaries : {e}"
 
 def check_done(state: SchemaDiscoveryState) -> str:
     processing_mode = state.get("processing_mode", "schema")
+    exhausted = len(state.get("pending_chunks", ())) == 0
     
     if processing_mode == "schema":
         # For schema discovery, check if we have enough chunks or reached limit
-        return "end" if not state["pending_chunks"] or state["count"] > 3 else "next"
+        return "end" if exhausted or state["count"] > 3 else "next"
     else:
         # For summarization, process all chunks
-        return "end" if not state["pending_chunks"] else "next"
+        return "end" if exhausted else "next"
 
 def merge_and_emit_tool_message(state: SchemaDiscoveryState) -> SchemaDiscoveryState:
-    print("merging and emitting tool message")
     processing_mode = state.get("processing_mode", "schema")
-    print("processing_mode", processing_mode)
-    print("state keys:", list(state.keys()))
-    print("summaries length:", len(state.get("summaries", [])))
-    print("partial_schemas length:", len(state.get("partial_schemas", [])))
+    logger.debug(
+        "Merging and emitting tool message: mode=%s summaries=%d partial_schemas=%d",
+        processing_mode, len(state.get("summaries", [])), len(state.get("partial_schemas", []))
+    )
     if processing_mode == "schema":
         # Original schema discovery logic
-        final_schema = state.get("partial_schemas")[-1]
+        partial_schemas = state.get("partial_schemas", [])
+        if len(partial_schemas) == 0:
+            logger.warning("No partial schemas found, returning empty schema")
+            return {"final_schema": {"Error": "No schema found"}, "processing_mode": "schema"}
+        final_schema = partial_schemas[-1]
         output_filename = "schema_discovery_results.json"
         with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(final_schema, f, indent=2)
-        print(f"Wrote schema discovery results to {output_filename}")
+            f.write(json_dumps(final_schema, indent=True))
+        logger.debug("Wrote schema discovery results to %s", output_filename)
         return {"final_schema": final_schema,"processing_mode": "schema"}
     else:
         ai_message_context = state.get("ai_message_context", "")
@@ -433,29 +635,43 @@ def merge_and_emit_tool_message(state: SchemaDiscoveryState) -> SchemaDiscoveryS
         
         # Summarization logic
         summaries = state.get("summaries", [])
+        if len(summaries) == 1:
+            # Already a single summary (one chunk, or one group merged); no final merge call
+            logger.info("[MERGE] Single summary, skipping final merge")
+            return {"final_summary": summaries[0]}
         if len(summaries) > 0:
+            logger.info("[MERGE] Merging %d summaries into final summary", len(summaries))
             # Create merger prompt and LLM chain for combining partial summaries
             try:
                 final_summary = merge_summaries(summaries, ai_message_context,current_suggestion)
-                print("Successfully merged summaries into final summary")
+                logger.debug("Successfully merged summaries into final summary")
                 return {"final_summary": final_summary}
                 
             except Exception as e:
-                print(f"Error merging summaries: {e}")
+                logger.error("Error merging summaries: %s", e)
                 final_summary = f"Error merging summaries : {e}"
                 # Fallback: use the last summary if merging fails
                 # final_summary = summaries[-1]
-                print("Using last summary as fallback")
                 return {"final_summary": final_summary}
         else:
-            print("No summaries found, returning empty summary")
+            logger.warning("No summaries found, returning empty summary")
             return {"final_summary": "No summary generated"}
 
 # ---- SUBGRAPH BUILDER ----
 
+def route_entry(state: SchemaDiscoveryState) -> str:
+    """Skip the mode decision when the caller already set processing_mode."""
+    return "preset" if state.get("processing_mode") in PROCESSING_MODES else "decide"
+
 def build_schema_discovery_subgraph(state_type=SchemaDiscoveryState) -> Runnable:
     builder = StateGraph(state_type)
-    builder.set_entry_point("decide_mode")
+    builder.set_conditional_entry_point(
+        route_entry,
+        {
+            "decide": "decide_mode",
+            "preset": "next_chunk"
+        }
+    )
 
     builder.add_node("decide_mode", decide_processing_mode)
     builder.add_node("next_chunk", next_chunk)
@@ -479,6 +695,73 @@ def build_schema_discovery_subgraph(state_type=SchemaDiscoveryState) -> Runnable
 
 # ---- WRAPPER FOR AGENT STATE COMPATIBILITY ----
 
+# Chunks carrying no data; each would otherwise cost an LLM call
+TRIVIAL_CHUNKS = {"", "{}", "[]", "null"}
+
+def pack_chunks(chunks: List[str], max_tokens: int = 4500, model: str = "claude-3-opus") -> List[str]:
+    """
+    Coalesce consecutive chunks up to max_tokens and drop chunks with no data.
+
+    chunk_data_by_tokens emits one chunk per line, so joining neighbours with a
+    newline restores the original text and cuts the number of LLM calls.
+    """
+    packed = []
+    current = []
+    current_tokens = 0
+    for chunk in chunks:
+        chunk_tokens = estimate_token_count(chunk, model)
+        if current and current_tokens + chunk_tokens >= max_tokens:
+            packed.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += chunk_tokens
+    if current:
+        packed.append("\n".join(current))
+    return [chunk for chunk in packed if chunk.strip() not in TRIVIAL_CHUNKS]
+
+def _upload_tool_data(data) -> dict:
+    """Upload raw tool output to S3 so generated code can fetch it by URL."""
+    bucket_name = os.getenv('AWS_BUCKET', 'your-test-bucket-name')
+    # Tool content is usually already JSON text; encode it once here rather than
+    # letting the uploader re-serialize it (list content is multimodal blocks)
+    body = (data if isinstance(data, str) else json_dumps(data)).encode('utf-8')
+    logger.debug("Uploading %d bytes of tool data to S3 bucket %s", len(body), bucket_name)
+    return upload_json_to_s3(
+        data=body,
+        bucket_name=bucket_name,
+        key=f"test-uploads/actual_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+
+async def _run_schema_discovery(schema_state: dict, data):
+    """
+    Run the subgraph, starting the S3 upload as soon as schema mode is chosen so
+    it overlaps with the schema LLM calls instead of following them.
+
+    Returns the final subgraph state and the finished upload task (None if the
+    upload was not started).
+    """
+    schema_subgraph = build_schema_discovery_subgraph()
+    response = schema_state
+    upload_task = None
+    if schema_state.get("processing_mode") == "schema":
+        # Mode was preset by the caller, so no decision step will announce it
+        upload_task = asyncio.ensure_future(asyncio.to_thread(_upload_tool_data, data))
+    try:
+        async for mode, chunk in schema_subgraph.astream(schema_state, stream_mode=["updates", "values"]):
+            if mode == "values":
+                response = chunk
+            elif upload_task is None and chunk.get("decide_mode", {}).get("processing_mode") == "schema":
+                upload_task = asyncio.ensure_future(asyncio.to_thread(_upload_tool_data, data))
+        if upload_task is not None:
+            # Let the upload finish; its errors are surfaced by the caller via .result()
+            await asyncio.wait([upload_task])
+    except BaseException:
+        if upload_task is not None:
+            upload_task.cancel()
+        raise
+    return response, upload_task
+
+
 def schema_discovery_wrapper(agent_state: dict) -> dict:
     """
     Enhanced wrapper function that uses full AI message context and decides between
@@ -492,19 +775,19 @@ def schema_discovery_wrapper(agent_state: dict) -> dict:
     """
     # 1. Get full AI message context from the latest AI message
     ai_message_context = get_latest_ai_message_context(agent_state)
-    print(f"[SCHEMA_DISCOVERY] AI message context: {ai_message_context}...")
+    logger.debug("[SCHEMA_DISCOVERY] AI message context: %s", ai_message_context)
     
     # 2. Extract relevant data from AgentState
     tool_output = agent_state.get("tool_output")
     tool_chunks = []  # Initialize with empty list
     data = None
     if tool_output and isinstance(tool_output, ToolMessage):
-        print("Tool output content type:", type(tool_output.content))
+        logger.debug("Tool output content type: %s", type(tool_output.content))
         data = tool_output.content
         
         # Use the utility function to chunk data by tokens
-        tool_chunks = chunk_data_by_tokens(data, max_tokens=5000, model="claude-3-opus")
-        print("Tool chunks:", len(tool_chunks))
+        tool_chunks = pack_chunks(chunk_data_by_tokens(data, max_tokens=5000, model="claude-3-opus"))
+        logger.debug("Tool chunks: %d", len(tool_chunks))
     
     # 3. Extract user query from messages
     # user_query = ""
@@ -516,10 +799,15 @@ def schema_discovery_wrapper(agent_state: dict) -> dict:
     
     # 4. Calculate data size
     data_size = estimate_token_count(data) if data else 0
+
+    # A caller that already knows the mode can set processing_mode to skip the decision step
+    preset_mode = agent_state.get("processing_mode")
+    if preset_mode not in PROCESSING_MODES:
+        preset_mode = ""
     
     # 5. Create enhanced SchemaDiscoveryState
     schema_state = {
-        "pending_chunks": tool_chunks,
+        "pending_chunks": deque(tool_chunks),
         "partial_schemas": [],
         "current_chunks": [],
         "parallel_chunks": [],
@@ -531,41 +819,35 @@ def schema_discovery_wrapper(agent_state: dict) -> dict:
         "ai_message_context": ai_message_context,
         # "user_query": user_query,
         "data_size": data_size,
-        "processing_mode": "schema",  # Default, will be decided by LLM
+        "processing_mode": preset_mode,  # Empty unless preset; decided by decide_mode
         "llm_suggestions": [],
         "db_store": agent_state.get("db_store", True)  # Use db_store from agent state, default to True
     }
     
     # 6. Run the enhanced schema discovery subgraph
-    schema_subgraph = build_schema_discovery_subgraph()
-    response = schema_subgraph.invoke(schema_state)
+    # (async, so LLM calls run concurrently; run_sync keeps every run on one shared loop,
+    # which the process-wide chat clients need, and also works inside a running loop)
+    response, s3_upload_task = run_sync(_run_schema_discovery(schema_state, data))
     
         # 7. Prepare result based on processing mode
     processing_mode = response.get("processing_mode", "schema")
     result = {}
     
-    print(f"Response keys: {list(response.keys())}")
-    print(f"Processing mode from response: {processing_mode}")
+    logger.debug("Processing mode from response: %s", processing_mode)
     
     if processing_mode == "schema":
         final_schema = response.get("final_schema", {"Error": "No schema found"})
         result = {
             "data_schema": final_schema,
         }
-        print("final_schema", final_schema)
+        logger.debug("final_schema: %s", final_schema)
         try:
-            print("uploading to s3")
-            bucket_name = os.getenv('AWS_BUCKET', 'your-test-bucket-name')
-            print("bucket_name", bucket_name)
-            s3_upload = upload_json_to_s3(
-                data=data,
-                bucket_name=bucket_name,
-                key=f"test-uploads/actual_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            )
-            print("s3_upload", s3_upload)
+            # Normally already finished: the upload ran alongside the schema LLM calls
+            s3_upload = s3_upload_task.result() if s3_upload_task else _upload_tool_data(data)
+            logger.debug("s3_upload: %s", s3_upload)
             result["data_uri"] = s3_upload.get('https_url')
         except Exception as e:
-            print(f"Error uploading to S3: {str(e)}")
+            logger.error("Error uploading to S3: %s", e)
             raise Exception(f"Error uploading to S3: {str(e)}")
 
     else:
@@ -578,12 +860,13 @@ def schema_discovery_wrapper(agent_state: dict) -> dict:
     # Upload tool output content to S3
    
     
-    print(f"[SCHEMA_DISCOVERY] Processing mode: {processing_mode}")
-    print(f"[SCHEMA_DISCOVERY] Result: {result}")
+    logger.info("[SCHEMA_DISCOVERY] Processing mode: %s", processing_mode)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[SCHEMA_DISCOVERY] Result: %s", result)
     if processing_mode == "summarize":
         json_result=final_summary
     else:
-        json_result = json.dumps(result)
+        json_result = json_dumps(result)
     tool_call_id = agent_state['tool_output'].tool_call_id
     tool_msg = ToolMessage(
         tool_call_id=tool_call_id,
@@ -3,11 +3,17 @@ System prompt for the assistant that provides context and rules for  AI  usage.
 """
 
 from datetime import datetime, timezone
+from functools import lru_cache
 
 def get_system_prompt() -> str:
     """Get the system prompt with current date context."""
     current_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    
+    return _build_system_prompt(current_date)
+
+
+@lru_cache(maxsize=2)
+def _build_system_prompt(current_date: str) -> str:
+    """Format the prompt once per date; a new date simply misses the cache."""
     return f"""You are Pulse, an AI agent that can use tools to help users. 
 
 Current date: {current_date}
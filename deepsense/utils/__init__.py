@@ -3,11 +3,12 @@ Utilities for DeepSense Framework
 """
 
 from .token_utils import estimate_token_count, chunk_data_by_tokens
-from .s3_utils import upload_json_to_s3
+from .s3_utils import upload_json_to_s3, upload_many_json_to_s3
 
 __all__ = [
     "estimate_token_count",
     "chunk_data_by_tokens",
     "upload_json_to_s3",
+    "upload_many_json_to_s3",
 ]
 
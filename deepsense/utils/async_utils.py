@@ -0,0 +1,51 @@
+"""
+Async utilities for DeepSense Framework.
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+# Event loop shared by all run_sync calls, running in a daemon thread
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="deepsense-run-sync", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Every call runs on the same long-lived event loop in a background thread,
+    so clients that are shared for the whole process (LLM clients, aiohttp
+    sessions) keep using the loop their pooled connections were opened on.
+    Works the same when called from inside a running loop (e.g. a sync helper
+    invoked by an async FastAPI endpoint); the calling thread blocks until the
+    coroutine finishes.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync cannot be called from a coroutine running on its own loop")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
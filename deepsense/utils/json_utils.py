@@ -0,0 +1,80 @@
+"""
+JSON utilities for DeepSense Framework.
+Uses orjson when it is installed and falls back to the standard library.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: Raw JSON as bytes (e.g. an HTTP response body) or str
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+
+    Output is compact by default, which keeps tool results small in LLM context.
+    Non-ASCII text is kept as-is rather than escaped. Values that are not
+    JSON-native (datetimes, Decimals, ...) are stringified.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with a two-space indent (for files read by people)
+
+    Returns:
+        JSON string
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=str, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the standard library handle it
+            pass
+    if indent:
+        return json.dumps(obj, default=str, indent=2, ensure_ascii=False)
+    return json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+
+    Same output as json_dumps, but returned as bytes for request bodies, which
+    skips the str round trip when orjson is installed.
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits; let the standard library handle it
+            pass
+    return json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
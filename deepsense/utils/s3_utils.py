@@ -2,29 +2,142 @@
 S3 utilities for uploading JSON data.
 """
 
-import json
+import gzip
+import io
 import os
+import threading
+import time
 import boto3
-from typing import Dict, Any, Union, Optional
-from datetime import datetime
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Sequence, Tuple, Union, Optional
+from datetime import datetime, timezone
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
+from deepsense.utils.json_utils import json_dumps_bytes
+
+# S3 clients by (region, access key id, secret key); clients are thread-safe and
+# keep a connection pool, so uploads reuse them instead of building one per call
+_S3_CLIENTS: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+_S3_LOCK = threading.Lock()
+
+_S3_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# Whether each bucket accepts object ACLs (see _bucket_supports_acl)
+_BUCKET_ACL_SUPPORT: Dict[str, bool] = {}
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+# Bodies at least this large are sent as a multipart upload with parts in parallel
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_THRESHOLD,
+    max_concurrency=10,
+    use_threads=True
+)
+
+
+def _get_s3_client(
+    region_name: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None
+):
+    """Get a cached S3 client for the given region and credentials (env vars by default)."""
+    key = (
+        region_name or os.getenv('AWS_REGION', 'us-east-1'),
+        aws_access_key_id or os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key or os.getenv('AWS_SECRET_ACCESS_KEY')
+    )
+    client = _S3_CLIENTS.get(key)
+    if client is None:
+        with _S3_LOCK:
+            client = _S3_CLIENTS.get(key)
+            if client is None:
+                # A session per client: the default boto3 session is not thread-safe
+                client = boto3.session.Session().client(
+                    's3',
+                    region_name=key[0],
+                    aws_access_key_id=key[1],
+                    aws_secret_access_key=key[2],
+                    config=_S3_CONFIG
+                )
+                _S3_CLIENTS[key] = client
+    return client
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO 8601 with millisecond precision."""
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _put_body(s3_client, bucket_name: str, key: str, body: bytes, extra_args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upload a body with put_object, or as a multipart upload once it reaches MULTIPART_THRESHOLD.
+
+    Returns the put_object response; multipart uploads return an empty dict.
+    """
+    if len(body) < MULTIPART_THRESHOLD:
+        return s3_client.put_object(Bucket=bucket_name, Key=key, Body=body, **extra_args)
+    s3_client.upload_fileobj(io.BytesIO(body), bucket_name, key, ExtraArgs=extra_args, Config=_TRANSFER_CONFIG)
+    return {}
+
+
+def _bucket_supports_acl(s3_client, bucket_name: str) -> Optional[bool]:
+    """
+    Whether a bucket accepts object ACLs, looked up once per bucket and cached.
+
+    Buckets with the BucketOwnerEnforced ownership setting (the S3 default for
+    new buckets) reject ACLs. Returns None when the setting can't be read
+    (e.g. no permission); the upload then finds out from the PUT itself.
+    """
+    if bucket_name in _BUCKET_ACL_SUPPORT:
+        return _BUCKET_ACL_SUPPORT[bucket_name]
+    try:
+        controls = s3_client.get_bucket_ownership_controls(Bucket=bucket_name)
+        rules = controls.get('OwnershipControls', {}).get('Rules', [])
+        supported = not any(rule.get('ObjectOwnership') == 'BucketOwnerEnforced' for rule in rules)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'OwnershipControlsNotFoundError':
+            return None
+        # No ownership controls: ACLs are enabled
+        supported = True
+    _BUCKET_ACL_SUPPORT[bucket_name] = supported
+    return supported
+
+
+def _acl_not_supported(e: Exception) -> bool:
+    """Whether an upload failed because the bucket has ACLs disabled."""
+    if isinstance(e, ClientError):
+        return e.response['Error']['Code'] == 'AccessControlListNotSupported'
+    # upload_fileobj wraps the ClientError and keeps only its message
+    return isinstance(e, S3UploadFailedError) and 'AccessControlListNotSupported' in str(e)
 
 
 def upload_json_to_s3(
-    data: Union[Dict[str, Any], str],
+    data: Union[Dict[str, Any], str, bytes],
     bucket_name: str,
     key: str,
     region_name: Optional[str] = None,
     aws_access_key_id: Optional[str] = None,
     aws_secret_access_key: Optional[str] = None,
     content_type: str = "application/json",
-    metadata: Optional[Dict[str, str]] = None
+    metadata: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    return_raw_response: bool = False
 ) -> Dict[str, Any]:
     """
     Upload JSON data to S3 bucket.
     
     Args:
-        data: JSON data as dictionary or JSON string
+        data: JSON data as dictionary, JSON string, or already UTF-8 encoded JSON bytes
         bucket_name: S3 bucket name
         key: S3 object key (file path in bucket)
         region_name: AWS region (defaults to environment variable or 'us-east-1')
@@ -32,6 +145,10 @@ def upload_json_to_s3(
         aws_secret_access_key: AWS secret key (defaults to environment variable)
         content_type: Content type for the S3 object
         metadata: Optional metadata to attach to the S3 object
+        compress: Gzip bodies over GZIP_MIN_BYTES and store them with
+            Content-Encoding: gzip. Off by default, since only readers that honor
+            Content-Encoding (browsers, requests) decompress transparently.
+        return_raw_response: Include the boto3 response under "response"
         
     Returns:
         Dictionary with upload result information
@@ -41,70 +158,75 @@ def upload_json_to_s3(
         ClientError: If S3 upload fails
     """
     try:
-        # Convert data to JSON string if it's a dictionary
-        if isinstance(data, dict):
-            json_data = json.dumps(data, indent=2, ensure_ascii=False)
+        # Convert data to UTF-8 JSON bytes once; bytes from the caller are sent as-is
+        if isinstance(data, bytes):
+            body = data
+        elif isinstance(data, dict):
+            # Compact: indentation only inflates the bytes on the wire
+            body = json_dumps_bytes(data)
         elif isinstance(data, str):
-            json_data = data
+            body = data.encode('utf-8')
         else:
-            raise ValueError("Data must be a dictionary or JSON string")
+            raise ValueError("Data must be a dictionary, JSON string, or JSON bytes")
         
-        # Initialize S3 client
-        s3_client = boto3.client(
-            's3',
-            region_name=region_name or os.getenv('AWS_REGION', 'us-east-1'),
-            aws_access_key_id=aws_access_key_id or os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=aws_secret_access_key or os.getenv('AWS_SECRET_ACCESS_KEY')
-        )
+        # Reuse the S3 client (and its connection pool) for these credentials
+        s3_client = _get_s3_client(region_name, aws_access_key_id, aws_secret_access_key)
         
         # Prepare metadata
         upload_metadata = {
-            'upload_timestamp': datetime.now().isoformat(),
+            'upload_timestamp': _utc_timestamp(),
             'content_type': 'application/json',
             'source': 'deepsense-framework'
         }
         if metadata:
             upload_metadata.update(metadata)
         
-        # Upload to S3 with public read access
-        try:
-            response = s3_client.put_object(
-                Bucket=bucket_name,
-                Key=key,
-                Body=json_data.encode('utf-8'),
-                ContentType=content_type,
-                Metadata=upload_metadata,
-                ACL='public-read'  # Make the object publicly readable
-            )
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'AccessControlListNotSupported':
-                # Bucket doesn't support ACLs, upload without ACL
-                print(f"⚠️  Bucket {bucket_name} doesn't support ACLs, uploading without public-read")
-                response = s3_client.put_object(
-                    Bucket=bucket_name,
-                    Key=key,
-                    Body=json_data.encode('utf-8'),
-                    ContentType=content_type,
-                    Metadata=upload_metadata
+        extra_args = {'ContentType': content_type, 'Metadata': upload_metadata}
+        # size_bytes reports the JSON size; the stored object may be smaller
+        size_bytes = len(body)
+        if compress and size_bytes > GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=6)
+            extra_args['ContentEncoding'] = 'gzip'
+        
+        # Upload to S3 with public read access, unless the bucket is known to reject ACLs
+        if _bucket_supports_acl(s3_client, bucket_name) is False:
+            response = _put_body(s3_client, bucket_name, key, body, extra_args)
+        else:
+            try:
+                response = _put_body(
+                    s3_client, bucket_name, key, body,
+                    {**extra_args, 'ACL': 'public-read'}  # Make the object publicly readable
                 )
-            else:
-                raise
+                _BUCKET_ACL_SUPPORT.setdefault(bucket_name, True)
+            except (ClientError, S3UploadFailedError) as e:
+                if _acl_not_supported(e):
+                    # Bucket doesn't support ACLs, upload without ACL (and skip the ACL from now on)
+                    print(f"⚠️  Bucket {bucket_name} doesn't support ACLs, uploading without public-read")
+                    _BUCKET_ACL_SUPPORT[bucket_name] = False
+                    response = _put_body(s3_client, bucket_name, key, body, extra_args)
+                else:
+                    raise
         
         # Generate S3 URL
         s3_url = f"s3://{bucket_name}/{key}"
         https_url = f"https://{bucket_name}.s3.amazonaws.com/{key}"
         
-        return {
+        result = {
             "success": True,
             "bucket": bucket_name,
             "key": key,
             "s3_url": s3_url,
             "https_url": https_url,
             "etag": response.get('ETag', '').strip('"'),
-            "size_bytes": len(json_data.encode('utf-8')),
-            "upload_timestamp": upload_metadata['upload_timestamp'],
-            "response": response
+            "version_id": response.get('VersionId'),
+            "request_id": response.get('ResponseMetadata', {}).get('RequestId'),
+            "size_bytes": size_bytes,
+            "upload_timestamp": upload_metadata['upload_timestamp']
         }
+        # The raw response is only kept on request, so results don't hold boto3 objects
+        if return_raw_response:
+            result["response"] = response
+        return result
         
     except NoCredentialsError:
         return {
@@ -126,3 +248,58 @@ def upload_json_to_s3(
             "error_type": type(e).__name__
         }
 
+
+
+def upload_many_json_to_s3(
+    items: Sequence[Tuple[str, Union[Dict[str, Any], str, bytes]]],
+    bucket_name: str,
+    region_name: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    content_type: str = "application/json",
+    metadata: Optional[Dict[str, str]] = None,
+    compress: bool = False,
+    max_workers: int = 16
+) -> List[Dict[str, Any]]:
+    """
+    Upload several JSON objects to one S3 bucket concurrently.
+    
+    Uploads run on a thread pool and share one cached S3 client, whose
+    connection pool (50 connections) covers up to 50 workers; 16-64 workers
+    suits most batches of small objects.
+    
+    Args:
+        items: (key, data) pairs; data as accepted by upload_json_to_s3
+        bucket_name: S3 bucket name
+        region_name: AWS region (defaults to environment variable or 'us-east-1')
+        aws_access_key_id: AWS access key (defaults to environment variable)
+        aws_secret_access_key: AWS secret key (defaults to environment variable)
+        content_type: Content type for the S3 objects
+        metadata: Optional metadata to attach to every object
+        compress: Gzip bodies (see upload_json_to_s3)
+        max_workers: Maximum number of uploads in flight
+        
+    Returns:
+        Upload result dictionaries, in the same order as items
+    """
+    if not items:
+        return []
+    # One timestamp for the whole batch rather than one per object
+    metadata = {'upload_timestamp': _utc_timestamp(), **(metadata or {})}
+    
+    def upload(item):
+        key, data = item
+        return upload_json_to_s3(
+            data=data,
+            bucket_name=bucket_name,
+            key=key,
+            region_name=region_name,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            content_type=content_type,
+            metadata=metadata,
+            compress=compress
+        )
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(upload, items))
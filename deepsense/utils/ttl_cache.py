@@ -0,0 +1,119 @@
+"""
+In-process TTL cache utilities for DeepSense Framework.
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a time-to-live.
+
+    Uses the monotonic clock, so expiry is unaffected by wall-clock changes.
+    Once maxsize is reached, the least recently used entry is evicted.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        """
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Default time-to-live in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None, max_age: Optional[float] = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+            max_age: Optional max entry age in seconds (defaults to the cache TTL)
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= max_age:
+                if max_age >= self.ttl:
+                    del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+def ttl_cache(ttl_seconds: float = 60.0, maxsize: int = 512) -> Callable:
+    """
+    Cache a function's results for ttl_seconds, keyed by its arguments.
+
+    Intended for idempotent datasource reads of slowly-changing data. Results
+    that are error dicts (the DataSource convention for failed requests) are
+    not cached, and calls with unhashable arguments bypass the cache. For
+    methods, self is part of the key, so instances do not share entries.
+    Each call gets its own deep copy of the result, so callers may modify it
+    without changing what later calls receive.
+
+    The cache is exposed as the wrapper's `cache` attribute.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = (args, frozenset(kwargs.items()))
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = func(*args, **kwargs)
+                if not (isinstance(result, dict) and "error" in result):
+                    cache.set(key, result)
+            return copy.deepcopy(result)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -6,16 +6,18 @@ Matches planner_react_agent flow with dynamic tools, system prompt, model, and A
 import os
 import json
 from datetime import datetime
-from typing import Dict, Any, List, Optional, TypedDict, Annotated, Sequence, Callable, Union
+from typing import Dict, Any, List, Optional, TypedDict, Annotated, Sequence, Callable, Union, Iterator, Tuple
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import (
-    HumanMessage, AIMessage, BaseMessage, ToolMessage, SystemMessage
+    HumanMessage, AIMessage, AIMessageChunk, BaseMessage, ToolMessage, SystemMessage
 )
 from langchain_core.tools import tool
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
 from deepsense.checkpointer import MongoDBCheckpointer
+from deepsense.utils.json_utils import json_loads
 
 # Import summarizer_graph - mandatory for chunking
 try:
@@ -57,7 +59,7 @@ def sandbox_code_tool(code: str, requirements: list[str] = [], language: str = "
             "language": language
         }, timeout=60)
         
-        out = response.json()
+        out = json_loads(response.content)
         stdout = out.get('stdout', '')
         stderr = out.get('stderr', '')
         
@@ -85,6 +87,16 @@ def sandbox_code_tool(code: str, requirements: list[str] = [], language: str = "
     except Exception as e:
         return f"Error executing code: {str(e)}"
 
+def _content_text(content: Any) -> str:
+    """Text of a message's content, which is a string or (e.g. for Anthropic) a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
 # Default system prompt
 def get_default_system_prompt() -> str:
     """Get the default system prompt."""
@@ -160,6 +172,9 @@ class Workflow:
         self.llm_provider = llm_provider
         self.api_key = api_key
         self.system_prompt = system_prompt or get_default_system_prompt()
+        # Prepended to the model input on every call and never stored in graph
+        # state, so checkpoints do not carry a copy of the prompt
+        self.system_message = SystemMessage(content=self.system_prompt)
         self.chunking_threshold = chunking_threshold
         
         # Verify summarizer_graph is available (mandatory)
@@ -212,6 +227,12 @@ class Workflow:
     
     def _build_graph(self):
         """Build the LangGraph workflow matching planner_react_agent flow."""
+        # Bind tools and build the tool node once per tool set, not on every query
+        # Sorted by name so the tool definitions sent with each request are
+        # identical across runs, which lets provider prompt caching reuse them
+        self.bound_model = self.llm.bind_tools(sorted(self.tools, key=lambda t: t.name))
+        self.tool_node = ToolNode(self.tools)
+        
         workflow = StateGraph(AgentState)
         
         # Add nodes matching planner_react_agent
@@ -256,24 +277,27 @@ class Workflow:
     
     def _tool_selection_node(self, state: AgentState) -> AgentState:
         """Node that binds all tools to the model."""
-        # Bind ALL tools once
-        bound_model = self.llm.bind_tools(self.tools)
-        
+        # ALL tools, bound once when the graph was built
         return {
             "selected_tools": self.tools,
-            "bound_model": bound_model,
+            "bound_model": self.bound_model,
             "tools_bound": True
         }
     
-    def _model_node(self, state: AgentState) -> AgentState:
+    def _model_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
         """Model node using pre-bound model from state."""
         messages = state["messages"]
         bound_model = state.get("bound_model")
         
         if not bound_model:
-            bound_model = self.llm.bind_tools(self.tools)
+            bound_model = self.bound_model
         
-        response = bound_model.invoke(messages)
+        # Threads checkpointed before the prompt moved out of state still hold
+        # SystemMessages mid-history; only the current prompt is sent, first
+        history = (m for m in messages if not isinstance(m, SystemMessage))
+        
+        # The run config carries the graph's callbacks, which stream() uses to receive tokens
+        response = bound_model.invoke([self.system_message, *history], config=config)
         
         return {"messages": [response]}
     
@@ -297,10 +321,15 @@ class Workflow:
         
         return "end"
     
-    def _tool_node_wrapper(self, state: AgentState) -> AgentState:
-        """Tool node wrapper - executes tools."""
-        tool_node = ToolNode(self.tools)
-        result = tool_node.invoke(state)
+    def _tool_node_wrapper(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """
+        Tool node wrapper - executes tools.
+        
+        ToolNode runs the tool calls of one AI message concurrently in a thread
+        pool; passing the run config on lets `max_concurrency` and callbacks
+        from the graph invocation apply to those calls.
+        """
+        result = self.tool_node.invoke(state, config=config)
         
         tool_messages = result.get("messages", [])
         tool_outputs = tool_messages if tool_messages else []
@@ -314,7 +343,7 @@ class Workflow:
         """Select one tool output at a time."""
         current_tool_index = state.get("current_tool_index", -1)
         tool_outputs = state.get("tool_outputs", [])
-        user_actions = state.get("user_actions", [])
+        user_actions = state.get("user_actions") or []
         
         current_tool_index += 1
         tool_output = None
@@ -332,7 +361,8 @@ class Workflow:
                     # Check if it's a tool response with user_action (from datasources with user_action=True)
                     if isinstance(content_data, dict) and content_data.get("user_action") == True:
                         # This is a user action, add it to user_actions
-                        user_actions.append(content_data)
+                        # (as a new list, so the list held in the incoming state is not mutated)
+                        user_actions = [*user_actions, content_data]
                         print(f"Added user action to user_actions. Total actions: {len(user_actions)}")
                         
                 except (json.JSONDecodeError, AttributeError) as e:
@@ -413,25 +443,14 @@ class Workflow:
         # Rebuild graph with new tools
         self.graph = self._build_graph()
     
-    def invoke(
+    def _prepare_run(
         self,
         query: str,
-        session_id: Optional[str] = None,
-        existing_messages: Optional[List[BaseMessage]] = None,
-        db_store: bool = True
-    ) -> Dict[str, Any]:
-        """
-        Invoke the workflow with a query.
-        
-        Args:
-            query: User query
-            session_id: Optional session/thread ID (used for LangGraph checkpoints)
-            existing_messages: Optional existing messages for context
-            db_store: Whether to store messages in database
-            
-        Returns:
-            Workflow result
-        """
+        session_id: Optional[str],
+        existing_messages: Optional[List[BaseMessage]],
+        db_store: bool
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the initial state and run config for a query."""
         # Create or get session/thread_id
         if not session_id and self.checkpointer and db_store:
             session_id = self.checkpointer.create_session()
@@ -439,11 +458,8 @@ class Workflow:
             import uuid
             session_id = str(uuid.uuid4())
         
-        # Build messages
-        messages = [SystemMessage(content=self.system_prompt)]
-        
-        if existing_messages:
-            messages.extend(existing_messages)
+        # Build messages (the system prompt is added by the model node)
+        messages = list(existing_messages) if existing_messages else []
         
         messages.append(HumanMessage(content=query))
         
@@ -473,6 +489,65 @@ class Workflow:
             }
         }
         
+        return initial_state, config
+    
+    def invoke(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        existing_messages: Optional[List[BaseMessage]] = None,
+        db_store: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Invoke the workflow with a query.
+        
+        Args:
+            query: User query
+            session_id: Optional session/thread ID (used for LangGraph checkpoints)
+            existing_messages: Optional existing messages for context
+            db_store: Whether to store messages in database
+            
+        Returns:
+            Workflow result
+        """
+        initial_state, config = self._prepare_run(query, session_id, existing_messages, db_store)
+        
         result = self.graph.invoke(initial_state, config=config)
         
         return result
+    
+    def stream(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        existing_messages: Optional[List[BaseMessage]] = None,
+        db_store: bool = True
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Run the workflow with a query, yielding the model's response tokens as they arrive.
+        
+        Args:
+            query: User query
+            session_id: Optional session/thread ID (used for LangGraph checkpoints)
+            existing_messages: Optional existing messages for context
+            db_store: Whether to store messages in database
+            
+        Yields:
+            ("token", text) for each chunk of model output, then
+            ("result", state) with the final workflow state (as returned by invoke)
+        """
+        initial_state, config = self._prepare_run(query, session_id, existing_messages, db_store)
+        
+        result = None
+        for mode, payload in self.graph.stream(initial_state, config=config, stream_mode=["messages", "values"]):
+            if mode == "values":
+                result = payload
+                continue
+            message, metadata = payload
+            # Only the agent's own model calls; summarizer LLM calls inside discover_schema are skipped
+            if metadata.get("langgraph_node") == "model" and isinstance(message, AIMessageChunk) and message.content:
+                text = _content_text(message.content)
+                if text:
+                    yield "token", text
+        
+        yield "result", result
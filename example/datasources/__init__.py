@@ -1,28 +1,37 @@
 """
 User-defined datasources for the example
+
+Datasource modules are imported on first access, so importing one datasource
+does not load all of the others.
 """
 
-from .crypto_source import CryptoDataSource
-from .github_source import GitHubDataSource
-from .helius_source import HeliusDataSource
-from .jupiter_source import JupiterDataSource
-from .weather_source import WeatherDataSource
-from .flight_source import FlightDataSource
-from .location_source import LocationDataSource
-from .dpsn_source import DPSNDataSource
-from .coingecko_source import CoinGeckoDataSource
-from .news_source import NewsDataSource
-
-__all__ = [
-    "CryptoDataSource",
-    "GitHubDataSource",
-    "HeliusDataSource",
-    "JupiterDataSource",
-    "WeatherDataSource",
-    "FlightDataSource",
-    "LocationDataSource",
-    "DPSNDataSource",
-    "CoinGeckoDataSource",
-    "NewsDataSource"
-]
+import importlib
+
+# Exported class name -> module that defines it
+_LAZY = {
+    "CryptoDataSource": ".crypto_source",
+    "GitHubDataSource": ".github_source",
+    "HeliusDataSource": ".helius_source",
+    "JupiterDataSource": ".jupiter_source",
+    "WeatherDataSource": ".weather_source",
+    "FlightDataSource": ".flight_source",
+    "LocationDataSource": ".location_source",
+    "DPSNDataSource": ".dpsn_source",
+    "CoinGeckoDataSource": ".coingecko_source",
+    "NewsDataSource": ".news_source",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    cls = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = cls
+    return cls
+
 
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
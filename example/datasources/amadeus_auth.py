@@ -0,0 +1,67 @@
+"""
+Amadeus OAuth token handling shared by the flight and location datasources
+"""
+
+import threading
+import time
+import requests
+from deepsense.utils.json_utils import json_loads
+from typing import Dict, Tuple
+
+# Access tokens by client id: (token, monotonic expiry time), shared by all Amadeus datasources
+_TOKEN_CACHE: Dict[str, Tuple[str, float]] = {}
+# Refresh tokens this many seconds before they expire
+_TOKEN_EXPIRY_MARGIN = 60
+# Serializes token refreshes so concurrent callers do not each request a new token
+_TOKEN_LOCK = threading.Lock()
+_TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
+_TOKEN_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _cached_token(client_id: str) -> str:
+    cached = _TOKEN_CACHE.get(client_id)
+    if cached and cached[1] - time.monotonic() > _TOKEN_EXPIRY_MARGIN:
+        return cached[0]
+    return ""
+
+
+def get_amadeus_token(session: requests.Session, client_id: str, client_secret: str) -> str:
+    """
+    Get an Amadeus access token, reusing a cached one until shortly before it expires.
+
+    Args:
+        session: Pooled session of the calling datasource, so refreshes reuse its
+                 open connection to the Amadeus host
+        client_id: Amadeus client ID
+        client_secret: Amadeus client secret
+
+    Returns:
+        The access token, or "" when credentials are missing or the request fails
+    """
+    if not client_id or not client_secret:
+        return ""
+
+    token = _cached_token(client_id)
+    if token:
+        return token
+
+    with _TOKEN_LOCK:
+        # Another caller may have refreshed the token while we waited
+        token = _cached_token(client_id)
+        if token:
+            return token
+        try:
+            data = {
+                "grant_type": "client_credentials",
+                "client_id": client_id,
+                "client_secret": client_secret
+            }
+            response = session.post(_TOKEN_URL, headers=_TOKEN_HEADERS, data=data, timeout=10)
+            response.raise_for_status()
+            token_data = json_loads(response.content)
+            token = token_data["access_token"]
+            # Amadeus tokens last 30 minutes unless the response says otherwise
+            _TOKEN_CACHE[client_id] = (token, time.monotonic() + float(token_data.get("expires_in", 1799)))
+            return token
+        except Exception:
+            return ""
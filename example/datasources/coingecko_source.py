@@ -3,7 +3,8 @@ CoinGecko DataSource implementation for example
 """
 
 from deepsense import DataSource, DataSourceConfig, tool
-from typing import Dict, Any, Optional
+from deepsense.utils.ttl_cache import ttl_cache
+from typing import Dict, Any, List, Optional
 
 class CoinGeckoDataSource(DataSource):
     """CoinGecko cryptocurrency data source."""
@@ -19,16 +20,45 @@ class CoinGeckoDataSource(DataSource):
     @tool(name="coingecko_data", description="Unified tool for accessing CoinGecko cryptocurrency data. Supports price, market data, trending, history, search, and more.")
     def get_coin_price(self, coin_id: str, vs_currency: str = "usd") -> Dict[str, Any]:
         """Get current price and market data for a specific cryptocurrency."""
-        return self.get("/simple/price", {"ids": coin_id, "vs_currencies": vs_currency, 
-                                          "include_market_cap": "true", "include_24hr_vol": "true"})
+        return self.get_coin_prices([coin_id], vs_currency)
+    
+    @tool(name="coingecko_data")
+    def get_coin_prices(self, coin_ids: List[str], vs_currency: str = "usd") -> Dict[str, Any]:
+        """Get current prices and market data for several cryptocurrencies in one request. Returns a dict keyed by coin id."""
+        snapshot = self.get_coin_snapshot(coin_ids, vs_currency)
+        if not isinstance(snapshot, list):
+            return snapshot
+        # Same shape as /simple/price with market cap and 24h volume included
+        return {
+            coin["id"]: {
+                vs_currency: coin.get("current_price"),
+                f"{vs_currency}_market_cap": coin.get("market_cap"),
+                f"{vs_currency}_24h_vol": coin.get("total_volume"),
+            }
+            for coin in snapshot
+        }
     
     @tool(name="coingecko_data")
     def get_coin_market_data(self, coin_id: str, vs_currency: str = "usd") -> Dict[str, Any]:
         """Get detailed market data for a specific cryptocurrency."""
-        return self.get("/coins/markets", {"vs_currency": vs_currency, "ids": coin_id, 
-                                          "order": "market_cap_desc", "per_page": 1, "page": 1})
+        return self.get_coin_snapshot([coin_id], vs_currency)
+    
+    @tool(name="coingecko_data")
+    def get_coin_snapshot(self, coin_ids: List[str], vs_currency: str = "usd") -> Dict[str, Any]:
+        """Get price, market cap, volume and 24h change for several cryptocurrencies in one request."""
+        if isinstance(coin_ids, str):
+            coin_ids = coin_ids.split(",")
+        return self._markets(tuple(c.strip() for c in coin_ids), vs_currency)
+    
+    @ttl_cache(ttl_seconds=30)
+    def _markets(self, coin_ids: tuple, vs_currency: str) -> Dict[str, Any]:
+        # Cached briefly so price and market data lookups in one flow share a request
+        return self.get("/coins/markets", {"vs_currency": vs_currency, "ids": ",".join(coin_ids),
+                                          "order": "market_cap_desc", "per_page": len(coin_ids), "page": 1,
+                                          "price_change_percentage": "24h"})
     
     @tool(name="coingecko_data")
+    @ttl_cache(ttl_seconds=300)
     def get_trending_coins(self) -> Dict[str, Any]:
         """Get trending coins in the last 24 hours."""
         return self.get("/search/trending")
@@ -44,11 +74,13 @@ class CoinGeckoDataSource(DataSource):
         return self.get(f"/coins/{coin_id}/market_chart", {"vs_currency": vs_currency, "days": days})
     
     @tool(name="coingecko_data")
+    @ttl_cache(ttl_seconds=600)
     def get_exchange_rates(self) -> Dict[str, Any]:
         """Get exchange rates."""
         return self.get("/exchange_rates")
     
     @tool(name="coingecko_data")
+    @ttl_cache(ttl_seconds=300)
     def get_global_data(self) -> Dict[str, Any]:
         """Get global cryptocurrency market data."""
         return self.get("/global")
@@ -59,6 +91,7 @@ class CoinGeckoDataSource(DataSource):
         return self.get("/search", {"query": query})
     
     @tool(name="coingecko_data")
+    @ttl_cache(ttl_seconds=120)
     def get_coin_info(self, coin_id: str) -> Dict[str, Any]:
         """Get comprehensive information for a specific coin."""
         return self.get(f"/coins/{coin_id}", {"localization": False, "tickers": False, 
@@ -66,6 +99,7 @@ class CoinGeckoDataSource(DataSource):
                                              "developer_data": False})
     
     @tool(name="coingecko_data")
+    @ttl_cache(ttl_seconds=60)
     def get_top_coins(self, vs_currency: str = "usd", order: str = "market_cap_desc", 
                      per_page: int = 100, page: int = 1) -> Dict[str, Any]:
         """Get top cryptocurrencies by market cap."""
@@ -3,7 +3,6 @@ DPSN Intelligence DataSource implementation for example
 """
 
 import os
-import requests
 from deepsense import DataSource, DataSourceConfig, tool
 from typing import Dict, Any
 
@@ -22,7 +21,8 @@ class DPSNDataSource(DataSource):
                 "Content-Type": "application/json",
                 "Authorization": api_token,
                 "User-Agent": "DeepSense/1.0"
-            }
+            },
+            max_retries=5
         )
         super().__init__(config)
         self.api_token = api_token
@@ -3,9 +3,14 @@ Flight DataSource implementation for example
 """
 
 import os
-import requests
+import random
+import zlib
 from deepsense import DataSource, DataSourceConfig, tool
+from deepsense.utils.json_utils import json_loads
 from typing import Dict, Any
+from .amadeus_auth import get_amadeus_token
+
+_MOCK_AIRLINES = ("AA", "UA", "DL", "BA", "LH")
 
 class FlightDataSource(DataSource):
     """Flight data source using Amadeus API."""
@@ -17,33 +22,14 @@ class FlightDataSource(DataSource):
         config = DataSourceConfig(
             name="flight",
             rest_url="https://test.api.amadeus.com/v2",
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            max_retries=5
         )
         super().__init__(config)
-        self._token = None
     
     def _get_token(self) -> str:
-        """Get Amadeus access token."""
-        if self._token:
-            return self._token
-        
-        if not self.client_id or not self.client_secret:
-            return ""
-        
-        try:
-            url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            data = {
-                "grant_type": "client_credentials",
-                "client_id": self.client_id,
-                "client_secret": self.client_secret
-            }
-            response = requests.post(url, headers=headers, data=data, timeout=10)
-            response.raise_for_status()
-            self._token = response.json()["access_token"]
-            return self._token
-        except:
-            return ""
+        """Get Amadeus access token, shared with the other Amadeus datasources."""
+        return get_amadeus_token(self.session, self.client_id, self.client_secret)
     
     @tool(name="find_flights", description="Find available flights between two cities on a specific date. Use get_location_codes first if city names are provided.")
     def find_flights(self, origin: str, destination: str, date: str) -> Dict[str, Any]:
@@ -78,7 +64,7 @@ class FlightDataSource(DataSource):
             url = f"{self.config.rest_url}/shopping/flight-offers"
             response = self.session.get(url, headers=headers, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             flights = []
             for offer in data.get("data", []):
@@ -109,27 +95,30 @@ class FlightDataSource(DataSource):
     
     def _get_mock_flights(self, origin: str, destination: str, date: str) -> Dict[str, Any]:
         """Return mock flight data."""
-        import random
-        random.seed(hash(f"{origin}{destination}{date}") % 1000)
-        airlines = ["AA", "UA", "DL", "BA", "LH"]
-        flights = []
-        for i in range(5):
-            flights.append({
+        # Private generator with a stable seed: same route and date give the same flights
+        # in every process, and the global random state is left alone
+        rng = random.Random(zlib.crc32(f"{origin}{destination}{date}".encode()))
+        origin, destination = origin.upper(), destination.upper()
+        carriers = rng.choices(_MOCK_AIRLINES, k=10)
+        flights = [
+            {
                 "id": f"mock_flight_{i}",
-                "price": {"total": str(random.randint(200, 1500)), "currency": "USD"},
+                "price": {"total": str(rng.randint(200, 1500)), "currency": "USD"},
                 "itineraries": [{
-                    "duration": f"PT{random.randint(1, 8)}H",
+                    "duration": f"PT{rng.randint(1, 8)}H",
                     "segments": [{
-                        "departure": {"airport": origin.upper(), "time": f"{date}T{random.randint(6, 22):02d}:00:00"},
-                        "arrival": {"airport": destination.upper(), "time": f"{date}T{random.randint(6, 22):02d}:00:00"},
-                        "carrier": random.choice(airlines),
-                        "flight_number": f"{random.choice(airlines)}{random.randint(100, 9999)}"
+                        "departure": {"airport": origin, "time": f"{date}T{rng.randint(6, 22):02d}:00:00"},
+                        "arrival": {"airport": destination, "time": f"{date}T{rng.randint(6, 22):02d}:00:00"},
+                        "carrier": carriers[2 * i],
+                        "flight_number": f"{carriers[2 * i + 1]}{rng.randint(100, 9999)}"
                     }]
                 }]
-            })
+            }
+            for i in range(5)
+        ]
         return {
-            "origin": origin.upper(),
-            "destination": destination.upper(),
+            "origin": origin,
+            "destination": destination,
             "date": date,
             "flights": flights,
             "total_count": len(flights),
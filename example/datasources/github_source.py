@@ -4,6 +4,7 @@ Example GitHub DataSource implementation
 
 import os
 from deepsense import DataSource, DataSourceConfig
+from deepsense.utils.ttl_cache import ttl_cache
 from typing import Dict, Any
 
 class GitHubDataSource(DataSource):
@@ -22,6 +23,7 @@ class GitHubDataSource(DataSource):
         )
         super().__init__(config)
     
+    @ttl_cache(ttl_seconds=300)
     def get_repository_info(self, owner: str, repo: str) -> Dict[str, Any]:
         """Get repository information."""
         return self.get(f"/repos/{owner}/{repo}")
@@ -3,8 +3,30 @@ Helius DataSource implementation for example
 """
 
 import os
+import re
+from functools import wraps
 from deepsense import DataSource, DataSourceConfig, tool
-from typing import Dict, Any, List, Optional
+from deepsense.utils.ttl_cache import ttl_cache
+from typing import Dict, Any, List, Optional, Callable
+
+# Solana addresses are base58-encoded 32-byte public keys (32-44 characters)
+_SOLANA_ADDRESS_RE = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{32,44}$")
+
+def _check_address(param: str) -> Callable:
+    """
+    Validate the given address parameter locally before making a request.
+    Malformed addresses return an error dict instead of costing an API round trip.
+    The address is expected to be the method's first argument.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            address = kwargs.get(param, args[0] if args else None)
+            if not isinstance(address, str) or not _SOLANA_ADDRESS_RE.match(address):
+                return {"error": f"Invalid Solana address for '{param}': {address}", "source": self.config.name}
+            return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class HeliusDataSource(DataSource):
     """Helius blockchain data source."""
@@ -19,23 +41,42 @@ class HeliusDataSource(DataSource):
             rest_url="https://api.helius.xyz/v0",
             rpc_url="https://mainnet.helius-rpc.com",
             params={"api-key": api_key},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            max_retries=5  # RPC-heavy: ride out 429/5xx bursts on the pooled connections
         )
         super().__init__(config)
         self.api_key = api_key
         self.network = network
     
     @tool(name="solana_blockchain_data", description="Comprehensive Solana blockchain data access tool powered by Helius API.")
+    @_check_address("address")
     def get_account_info(self, address: str) -> Dict[str, Any]:
         """Get comprehensive account information for a wallet address."""
         return self.rpc_post("getAccountInfo", [address, {"encoding": "jsonParsed"}])
     
     @tool(name="solana_blockchain_data")
+    @_check_address("address")
     def get_balance(self, address: str) -> Dict[str, Any]:
         """Get SOL (native token) balance for a wallet address."""
         return self.rpc_post("getBalance", [address])
     
     @tool(name="solana_blockchain_data")
+    @_check_address("address")
+    def get_wallet_overview(self, address: str) -> Dict[str, Any]:
+        """Get account information, SOL balance and SPL token accounts for a wallet in one request."""
+        account_info, balance, token_accounts = self.rpc_batch([
+            ("getAccountInfo", [address, {"encoding": "jsonParsed"}]),
+            ("getBalance", [address]),
+            ("getTokenAccountsByOwner", [
+                address,
+                {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
+                {"encoding": "jsonParsed"}
+            ])
+        ])
+        return {"account_info": account_info, "balance": balance, "token_accounts": token_accounts}
+    
+    @tool(name="solana_blockchain_data")
+    @_check_address("address")
     def get_token_accounts(self, address: str) -> Dict[str, Any]:
         """Get all SPL token accounts owned by a wallet."""
         return self.rpc_post("getTokenAccountsByOwner", [
@@ -45,6 +86,7 @@ class HeliusDataSource(DataSource):
         ])
     
     @tool(name="solana_blockchain_data")
+    @_check_address("address")
     def get_nft_accounts(self, address: str, page: int = 1, limit: int = 50) -> Dict[str, Any]:
         """Get all NFT accounts owned by a wallet."""
         params = {
@@ -55,6 +97,7 @@ class HeliusDataSource(DataSource):
         return self.rpc_post("getAssetsByOwner", params)
     
     @tool(name="solana_blockchain_data")
+    @_check_address("address")
     def get_enhanced_transactions_by_address(self, address: str, limit: int = 100, 
                                             before: Optional[str] = None, 
                                             until: Optional[str] = None, 
@@ -77,21 +120,28 @@ class HeliusDataSource(DataSource):
         return self.post("transactions", data)
     
     @tool(name="solana_blockchain_data")
+    @ttl_cache(ttl_seconds=3600)  # Asset metadata rarely changes after mint
+    @_check_address("mint_address")
     def get_token_metadata(self, mint_address: str) -> Dict[str, Any]:
         """Get comprehensive metadata for a specific SPL token."""
         return self.rpc_post("getAsset", {"id": mint_address})
     
     @tool(name="solana_blockchain_data")
+    @ttl_cache(ttl_seconds=3600)
+    @_check_address("mint_address")
     def get_nft_metadata(self, mint_address: str) -> Dict[str, Any]:
         """Get comprehensive metadata for a specific NFT."""
         return self.rpc_post("getAsset", {"id": mint_address})
     
     @tool(name="solana_blockchain_data")
+    @ttl_cache(ttl_seconds=3600)
+    @_check_address("asset_id")
     def get_asset_by_id(self, asset_id: str) -> Dict[str, Any]:
         """Get detailed information for a specific digital asset."""
         return self.rpc_post("getAsset", {"id": asset_id})
     
     @tool(name="solana_blockchain_data")
+    @_check_address("owner_address")
     def get_assets_by_owner(self, owner_address: str, page: int = 1) -> Dict[str, Any]:
         """Get all digital assets owned by a wallet address."""
         return self.rpc_post("getAssetsByOwner", {"ownerAddress": owner_address, "page": page})
@@ -2,11 +2,26 @@
 Jupiter DataSource implementation for example
 """
 
+import copy
 import os
 from deepsense import DataSource, DataSourceConfig, tool
+from deepsense.utils.ttl_cache import TTLCache, ttl_cache
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# Quote parameters for get_quote's defaults; calls copy this and override what differs
+_QUOTE_PARAMS = {
+    "inputMint": None,
+    "outputMint": None,
+    "amount": None,
+    "swapMode": "ExactIn",
+    "restrictIntermediateTokens": "true",
+    "onlyDirectRoutes": "false",
+    "asLegacyTransaction": "false",
+    "maxAccounts": 64,
+    "dynamicSlippage": "false"
+}
+
 class JupiterDataSource(DataSource):
     """Jupiter token swap data source."""
     
@@ -17,6 +32,54 @@ class JupiterDataSource(DataSource):
             headers={"Content-Type": "application/json"}
         )
         super().__init__(config)
+        # Tokens from batched searches, so later lookups skip the network
+        self._token_index_by_mint = TTLCache(maxsize=4096, ttl=300)
+        self._token_index_by_symbol = TTLCache(maxsize=4096, ttl=300)
+    
+    @staticmethod
+    def _as_list(result: Any) -> Any:
+        """
+        Normalize a search response to a token list, once, where it comes off the network.
+        Accepts a list, {"data": [...]}, or a single token object; error dicts are returned as-is.
+        """
+        if isinstance(result, list):
+            return result
+        if isinstance(result, dict):
+            return result if "error" in result else result.get("data", [result])
+        return []
+    
+    @staticmethod
+    def _verified_only(tokens: Any) -> Dict[str, Any]:
+        """Filter a normalized search result down to verified tokens."""
+        if not isinstance(tokens, list):
+            return {"data": []}
+        return {"data": [token for token in tokens if token.get("isVerified")]}
+    
+    def _index_tokens(self, result: Any) -> None:
+        """Index tokens from a normalized search result by mint address and symbol."""
+        if not isinstance(result, list):
+            return
+        by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+        for token in result:
+            if not isinstance(token, dict):
+                continue
+            mint = token.get("id") or token.get("address")
+            if mint:
+                self._token_index_by_mint.set(mint, token)
+            symbol = token.get("symbol")
+            if symbol:
+                by_symbol.setdefault(symbol.upper(), []).append(token)
+        for symbol, tokens in by_symbol.items():
+            self._token_index_by_symbol.set(symbol, tokens)
+    
+    def prefetch_tokens(self, mints_or_symbols: List[str]) -> None:
+        """
+        Fetch many tokens up front so get_token_info and get_token_by_symbol
+        answer from memory. Call once at workflow start with every mint or
+        symbol the workflow will look up; queries are batched 100 at a time.
+        """
+        for i in range(0, len(mints_or_symbols), 100):
+            self._index_tokens(self.search_tokens(",".join(mints_or_symbols[i:i + 100])))
     
     @tool(
         name="jupiter_ag_apis",
@@ -39,17 +102,22 @@ class JupiterDataSource(DataSource):
                   dynamic_slippage: Optional[bool] = False) -> Dict[str, Any]:
         """Get the best possible quote for a token swap. This API aggregates liquidity from various DEXes on Solana to provide optimal routing for trades."""
         endpoint = "swap/v1/quote"
-        params = {
-            "inputMint": input_mint,
-            "outputMint": output_mint,
-            "amount": str(amount),
-            "swapMode": swap_mode,
-            "restrictIntermediateTokens": str(restrict_intermediate_tokens).lower(),
-            "onlyDirectRoutes": str(only_direct_routes).lower(),
-            "asLegacyTransaction": str(as_legacy_transaction).lower(),
-            "maxAccounts": max_accounts,
-            "dynamicSlippage": str(dynamic_slippage).lower()
-        }
+        params = _QUOTE_PARAMS.copy()
+        params["inputMint"] = input_mint
+        params["outputMint"] = output_mint
+        params["amount"] = str(amount)
+        if swap_mode != "ExactIn":
+            params["swapMode"] = swap_mode
+        if not restrict_intermediate_tokens:
+            params["restrictIntermediateTokens"] = "false"
+        if only_direct_routes:
+            params["onlyDirectRoutes"] = "true"
+        if as_legacy_transaction:
+            params["asLegacyTransaction"] = "true"
+        if max_accounts != 64:
+            params["maxAccounts"] = max_accounts
+        if dynamic_slippage:
+            params["dynamicSlippage"] = "true"
         
         if slippage_bps is not None:
             params["slippageBps"] = slippage_bps
@@ -72,62 +140,84 @@ class JupiterDataSource(DataSource):
         }
     
     @tool(name="jupiter_ag_apis")
-    def search_tokens(self, query: str) -> Dict[str, Any]:
+    @ttl_cache(ttl_seconds=60, maxsize=1024)
+    def search_tokens(self, query: str) -> List[Dict[str, Any]]:
         """Search for tokens by symbol, name, or mint address. Returns comprehensive token information including mint address, symbol, name, decimals, and metadata."""
-        return self.get("tokens/v2/search", {"query": query})
+        return self._as_list(self.get("tokens/v2/search", {"query": query}))
     
     @tool(name="jupiter_ag_apis")
     def get_token_info(self, mint_address: str) -> List[Dict[str, Any]]:
         """Get token info - returns list (Jupiter tool expects list)."""
-        # Use search with mint address - returns list
+        token = self._token_index_by_mint.get(mint_address)
+        if token is not None:
+            # Copied so callers cannot change the indexed token
+            return [copy.deepcopy(token)]
+        # Use search with mint address - returns list (an error is returned as a one-item list)
         result = self.search_tokens(mint_address)
-        # Handle both list and dict responses
-        if isinstance(result, list):
-            return result
-        elif isinstance(result, dict) and "data" in result:
-            return result["data"]
-        elif isinstance(result, dict):
-            return [result]
-        return []
+        return result if isinstance(result, list) else [result]
     
     @tool(name="jupiter_ag_apis")
     def get_verified_tokens(self, query: str) -> Dict[str, Any]:
         """Search for verified tokens only (filters out potential scam tokens)."""
-        result = self.search_tokens(query)
-        # Filter for verified tokens
-        if isinstance(result, list):
-            verified = [token for token in result if token.get("isVerified", False)]
-            return {"data": verified}
-        elif isinstance(result, dict) and "data" in result:
-            verified = [token for token in result["data"] if token.get("isVerified", False)]
-            return {"data": verified}
-        return {"data": []}
+        return self._verified_only(self.search_tokens(query))
     
     @tool(name="jupiter_ag_apis")
-    def get_token_by_symbol(self, symbol: str) -> Dict[str, Any]:
-        """Get token information by symbol (e.g., 'USDC', 'SOL')."""
-        return self.search_tokens(symbol)
+    def get_token_by_symbol(self, symbol: str) -> List[Dict[str, Any]]:
+        """Get token information by symbol (e.g., 'USDC', 'SOL') - returns list of tokens with exactly that symbol."""
+        symbol = symbol.upper()
+        tokens = self._token_index_by_symbol.get(symbol)
+        if tokens is not None:
+            return copy.deepcopy(tokens)
+        result = self.search_tokens(symbol)
+        if not isinstance(result, list):
+            return result
+        # Search matches fuzzily; keep exact symbol matches so this agrees with the index
+        return [token for token in result if isinstance(token, dict) and (token.get("symbol") or "").upper() == symbol]
     
     @tool(name="jupiter_ag_apis")
-    def get_token_by_name(self, name: str) -> Dict[str, Any]:
-        """Get token information by name (e.g., 'Wrapped Solana')."""
+    def get_token_by_name(self, name: str) -> List[Dict[str, Any]]:
+        """Get token information by name (e.g., 'Wrapped Solana') - returns list of matching tokens."""
         return self.search_tokens(name)
     
     @tool(name="jupiter_ag_apis")
-    def get_multiple_tokens(self, mint_addresses: List[str]) -> Dict[str, Any]:
+    def get_multiple_tokens(self, mint_addresses: List[str]) -> List[Dict[str, Any]]:
         """Get information for multiple tokens by their mint addresses (max 100)."""
         if len(mint_addresses) > 100:
             raise ValueError("Maximum 100 mint addresses allowed")
         # Search with comma-separated mints
         query = ",".join(mint_addresses)
-        return self.search_tokens(query)
+        result = self.search_tokens(query)
+        self._index_tokens(result)
+        return result
     
     @tool(name="jupiter_ag_apis")
-    def get_popular_tokens(self) -> Dict[str, Any]:
+    @ttl_cache(ttl_seconds=600)
+    def get_popular_tokens(self) -> List[Dict[str, Any]]:
         """Get a list of popular/verified tokens."""
         # Search for common tokens
         popular_symbols = ["SOL", "USDC", "USDT", "BTC", "ETH"]
-        return self.search_tokens(",".join(popular_symbols))
+        result = self.search_tokens(",".join(popular_symbols))
+        self._index_tokens(result)
+        return result
+    
+    # Async variants on the shared aiohttp session, for async workflows that look up many tokens at once
+    
+    async def asearch_tokens(self, query: str) -> List[Dict[str, Any]]:
+        """Search for tokens by symbol, name, or mint address (async)."""
+        return self._as_list(await self.aget("tokens/v2/search", {"query": query}))
+    
+    async def aget_token_info(self, mint_address: str) -> List[Dict[str, Any]]:
+        """Get token info by mint address (async)."""
+        token = self._token_index_by_mint.get(mint_address)
+        if token is not None:
+            # Copied so callers cannot change the indexed token
+            return [copy.deepcopy(token)]
+        result = await self.asearch_tokens(mint_address)
+        return result if isinstance(result, list) else [result]
+    
+    async def aget_verified_tokens(self, query: str) -> Dict[str, Any]:
+        """Search for verified tokens only (async)."""
+        return self._verified_only(await self.asearch_tokens(query))
     
     def health_check(self) -> bool:
         """Check if the data source is accessible."""
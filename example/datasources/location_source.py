@@ -3,9 +3,22 @@ Location DataSource implementation for example
 """
 
 import os
-import requests
 from deepsense import DataSource, DataSourceConfig, tool
+from deepsense.utils.json_utils import json_loads
 from typing import Dict, Any
+from .amadeus_auth import get_amadeus_token
+
+# Mock locations for well-known keywords, used when no Amadeus credentials are set
+_MOCK_LOCATIONS = {
+    "london": [
+        {"name": "London Heathrow Airport", "iata_code": "LHR", "sub_type": "AIRPORT", "city_name": "London", "country_code": "GB"},
+        {"name": "London", "iata_code": "LON", "sub_type": "CITY", "city_name": "London", "country_code": "GB"}
+    ],
+    "paris": [
+        {"name": "Paris Charles de Gaulle Airport", "iata_code": "CDG", "sub_type": "AIRPORT", "city_name": "Paris", "country_code": "FR"},
+        {"name": "Paris", "iata_code": "PAR", "sub_type": "CITY", "city_name": "Paris", "country_code": "FR"}
+    ]
+}
 
 class LocationDataSource(DataSource):
     """Location data source using Amadeus API."""
@@ -20,30 +33,10 @@ class LocationDataSource(DataSource):
             headers={"Content-Type": "application/json"}
         )
         super().__init__(config)
-        self._token = None
     
     def _get_token(self) -> str:
-        """Get Amadeus access token."""
-        if self._token:
-            return self._token
-        
-        if not self.client_id or not self.client_secret:
-            return ""
-        
-        try:
-            url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            data = {
-                "grant_type": "client_credentials",
-                "client_id": self.client_id,
-                "client_secret": self.client_secret
-            }
-            response = requests.post(url, headers=headers, data=data, timeout=10)
-            response.raise_for_status()
-            self._token = response.json()["access_token"]
-            return self._token
-        except:
-            return ""
+        """Get Amadeus access token, shared with the other Amadeus datasources."""
+        return get_amadeus_token(self.session, self.client_id, self.client_secret)
     
     @tool(name="get_location_codes", description="Get location codes for airports and cities using a keyword. Use this before find_flights when you need IATA codes.")
     def get_location_codes(self, keyword: str, sub_type: str = "CITY,AIRPORT") -> Dict[str, Any]:
@@ -65,7 +58,7 @@ class LocationDataSource(DataSource):
             url = f"{self.config.rest_url}/reference-data/locations"
             response = self.session.get(url, headers=headers, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             locations = []
             for location in data.get("data", []):
@@ -88,23 +81,9 @@ class LocationDataSource(DataSource):
     
     def _get_mock_locations(self, keyword: str, sub_type: str) -> Dict[str, Any]:
         """Return mock location data."""
-        import random
-        random.seed(hash(keyword.lower()) % 1000)
-        
-        location_mappings = {
-            "london": [
-                {"name": "London Heathrow Airport", "iata_code": "LHR", "sub_type": "AIRPORT", "city_name": "London", "country_code": "GB"},
-                {"name": "London", "iata_code": "LON", "sub_type": "CITY", "city_name": "London", "country_code": "GB"}
-            ],
-            "paris": [
-                {"name": "Paris Charles de Gaulle Airport", "iata_code": "CDG", "sub_type": "AIRPORT", "city_name": "Paris", "country_code": "FR"},
-                {"name": "Paris", "iata_code": "PAR", "sub_type": "CITY", "city_name": "Paris", "country_code": "FR"}
-            ]
-        }
-        
         keyword_lower = keyword.lower()
-        if keyword_lower in location_mappings:
-            locations = location_mappings[keyword_lower]
+        if keyword_lower in _MOCK_LOCATIONS:
+            locations = list(_MOCK_LOCATIONS[keyword_lower])
         else:
             locations = [{
                 "name": keyword.title(),
@@ -2,9 +2,10 @@
 News DataSource implementation for example
 """
 
+import asyncio
 import os
 from deepsense import DataSource, DataSourceConfig
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 class NewsDataSource(DataSource):
     """News data source using NewsAPI."""
@@ -20,36 +21,31 @@ class NewsDataSource(DataSource):
         super().__init__(config)
         self.api_key = api_key
     
-    def get_top_headlines(self, country: str = "us", category: Optional[str] = None, 
-                         page_size: int = 20, page: int = 1) -> Dict[str, Any]:
-        """Get top headlines."""
+    @staticmethod
+    def _headline_params(country: str, category: Optional[str], page_size: int, page: int) -> Dict[str, Any]:
         params = {"country": country, "pageSize": page_size, "page": page}
         if category:
             params["category"] = category
-        return self.get("/top-headlines", params)
+        return params
     
-    def search_news(self, query: str, language: str = "en", sort_by: str = "publishedAt",
-                   from_date: Optional[str] = None, to_date: Optional[str] = None,
-                   page_size: int = 20, page: int = 1) -> Dict[str, Any]:
-        """Search news."""
+    @staticmethod
+    def _search_params(query: str, language: str, sort_by: str, from_date: Optional[str],
+                       to_date: Optional[str], page_size: int, page: int) -> Dict[str, Any]:
         params = {"q": query, "language": language, "sortBy": sort_by, 
                  "pageSize": page_size, "page": page}
         if from_date:
             params["from"] = from_date
         if to_date:
             params["to"] = to_date
-        return self.get("/everything", params)
+        return params
     
-    def get_news_by_domain(self, domain: str, language: str = "en", sort_by: str = "publishedAt",
-                          page_size: int = 20, page: int = 1) -> Dict[str, Any]:
-        """Get news by domain."""
-        params = {"domains": domain, "language": language, "sortBy": sort_by, 
-                 "pageSize": page_size, "page": page}
-        return self.get("/everything", params)
+    @staticmethod
+    def _domain_params(domain: str, language: str, sort_by: str, page_size: int, page: int) -> Dict[str, Any]:
+        return {"domains": domain, "language": language, "sortBy": sort_by, 
+                "pageSize": page_size, "page": page}
     
-    def get_news_sources(self, category: Optional[str] = None, language: Optional[str] = None,
-                        country: Optional[str] = None) -> Dict[str, Any]:
-        """Get news sources."""
+    @staticmethod
+    def _sources_params(category: Optional[str], language: Optional[str], country: Optional[str]) -> Dict[str, Any]:
         params = {}
         if category:
             params["category"] = category
@@ -57,7 +53,28 @@ class NewsDataSource(DataSource):
             params["language"] = language
         if country:
             params["country"] = country
-        return self.get("/sources", params)
+        return params
+    
+    def get_top_headlines(self, country: str = "us", category: Optional[str] = None, 
+                         page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Get top headlines."""
+        return self.get_conditional("/top-headlines", self._headline_params(country, category, page_size, page))
+    
+    def search_news(self, query: str, language: str = "en", sort_by: str = "publishedAt",
+                   from_date: Optional[str] = None, to_date: Optional[str] = None,
+                   page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Search news."""
+        return self.get("/everything", self._search_params(query, language, sort_by, from_date, to_date, page_size, page))
+    
+    def get_news_by_domain(self, domain: str, language: str = "en", sort_by: str = "publishedAt",
+                          page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Get news by domain."""
+        return self.get("/everything", self._domain_params(domain, language, sort_by, page_size, page))
+    
+    def get_news_sources(self, category: Optional[str] = None, language: Optional[str] = None,
+                        country: Optional[str] = None) -> Dict[str, Any]:
+        """Get news sources."""
+        return self.get("/sources", self._sources_params(category, language, country))
     
     def get_news_by_topic(self, topic: str, language: str = "en", sort_by: str = "publishedAt",
                          page_size: int = 20, page: int = 1) -> Dict[str, Any]:
@@ -72,6 +89,44 @@ class NewsDataSource(DataSource):
         """Get news analysis."""
         return self.search_news(query, language, "popularity", None, None, page_size, 1)
     
+    # Async variants on the shared aiohttp session, so callers can gather many queries at once
+    
+    async def aget_top_headlines(self, country: str = "us", category: Optional[str] = None, 
+                                 page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Get top headlines (async)."""
+        return await self.aget("/top-headlines", self._headline_params(country, category, page_size, page))
+    
+    async def asearch_news(self, query: str, language: str = "en", sort_by: str = "publishedAt",
+                           from_date: Optional[str] = None, to_date: Optional[str] = None,
+                           page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Search news (async)."""
+        return await self.aget("/everything", self._search_params(query, language, sort_by, from_date, to_date, page_size, page))
+    
+    async def aget_news_by_domain(self, domain: str, language: str = "en", sort_by: str = "publishedAt",
+                                  page_size: int = 20, page: int = 1) -> Dict[str, Any]:
+        """Get news by domain (async)."""
+        return await self.aget("/everything", self._domain_params(domain, language, sort_by, page_size, page))
+    
+    async def aget_news_sources(self, category: Optional[str] = None, language: Optional[str] = None,
+                                country: Optional[str] = None) -> Dict[str, Any]:
+        """Get news sources (async)."""
+        return await self.aget("/sources", self._sources_params(category, language, country))
+    
+    async def aget_top_headlines_many(self, countries: List[str], category: Optional[str] = None,
+                                      page_size: int = 20) -> Dict[str, Dict[str, Any]]:
+        """Get top headlines for several countries concurrently. Returns a dict keyed by country."""
+        results = await asyncio.gather(
+            *(self.aget_top_headlines(country, category, page_size, 1) for country in countries)
+        )
+        return dict(zip(countries, results))
+    
+    async def ahealth_check(self) -> bool:
+        """Check if the data source is accessible (async)."""
+        if not self.api_key:
+            return False
+        result = await self.aget_top_headlines("us", None, 1, 1)
+        return "error" not in result
+    
     def health_check(self) -> bool:
         """Check if the data source is accessible."""
         try:
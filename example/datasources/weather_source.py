@@ -3,10 +3,34 @@ Weather DataSource implementation for example
 """
 
 import os
-import requests
+import random
+import zlib
 from deepsense import DataSource, DataSourceConfig, tool
 from typing import Dict, Any
 
+
+def _build_mock_weather(seed: int) -> Dict[str, Any]:
+    """Generate one mock weather entry from a private seeded RNG."""
+    rng = random.Random(seed)
+    temp = rng.randint(15, 30)
+    return {
+        "country": "Mock",
+        "temperature": {
+            "current": temp,
+            "feels_like": temp + rng.randint(-2, 2),
+            "min": temp - rng.randint(2, 5),
+            "max": temp + rng.randint(2, 5)
+        },
+        "description": rng.choice(["clear sky", "few clouds", "scattered clouds", "rain"]),
+        "humidity": rng.randint(40, 90),
+        "pressure": rng.randint(1000, 1020),
+        "wind_speed": round(rng.uniform(0, 15), 1),
+        "note": "This is mock data. Set OPENWEATHER_API_KEY for real data."
+    }
+
+# Pregenerated mock weather, picked by a stable hash of the city name
+_MOCK_WEATHER_TABLE = [_build_mock_weather(i) for i in range(256)]
+
 class WeatherDataSource(DataSource):
     """Weather data source using OpenWeatherMap."""
     
@@ -33,44 +57,31 @@ class WeatherDataSource(DataSource):
             return self._get_mock_weather(city)
         
         # Format the response
+        main = result.get("main") or {}
+        sys_info = result.get("sys") or {}
+        weather = (result.get("weather") or [{}])[0]
         return {
             "city": result.get("name", city),
-            "country": result.get("sys", {}).get("country", ""),
+            "country": sys_info.get("country", ""),
             "temperature": {
-                "current": round(result.get("main", {}).get("temp", 0), 1),
-                "feels_like": round(result.get("main", {}).get("feels_like", 0), 1),
-                "min": round(result.get("main", {}).get("temp_min", 0), 1),
-                "max": round(result.get("main", {}).get("temp_max", 0), 1)
+                "current": round(main.get("temp", 0), 1),
+                "feels_like": round(main.get("feels_like", 0), 1),
+                "min": round(main.get("temp_min", 0), 1),
+                "max": round(main.get("temp_max", 0), 1)
             },
-            "description": result.get("weather", [{}])[0].get("description", ""),
-            "humidity": result.get("main", {}).get("humidity", 0),
-            "pressure": result.get("main", {}).get("pressure", 0),
-            "wind_speed": result.get("wind", {}).get("speed", 0),
+            "description": weather.get("description", ""),
+            "humidity": main.get("humidity", 0),
+            "pressure": main.get("pressure", 0),
+            "wind_speed": (result.get("wind") or {}).get("speed", 0),
             "visibility": result.get("visibility", "N/A"),
-            "sunrise": result.get("sys", {}).get("sunrise", 0),
-            "sunset": result.get("sys", {}).get("sunset", 0)
+            "sunrise": sys_info.get("sunrise", 0),
+            "sunset": sys_info.get("sunset", 0)
         }
     
     def _get_mock_weather(self, city: str) -> Dict[str, Any]:
         """Return mock weather data."""
-        import random
-        random.seed(hash(city) % 1000)
-        temp = random.randint(15, 30)
-        return {
-            "city": city,
-            "country": "Mock",
-            "temperature": {
-                "current": temp,
-                "feels_like": temp + random.randint(-2, 2),
-                "min": temp - random.randint(2, 5),
-                "max": temp + random.randint(2, 5)
-            },
-            "description": random.choice(["clear sky", "few clouds", "scattered clouds", "rain"]),
-            "humidity": random.randint(40, 90),
-            "pressure": random.randint(1000, 1020),
-            "wind_speed": round(random.uniform(0, 15), 1),
-            "note": "This is mock data. Set OPENWEATHER_API_KEY for real data."
-        }
+        entry = _MOCK_WEATHER_TABLE[zlib.crc32(city.encode()) & 0xFF]
+        return {"city": city, **entry, "temperature": dict(entry["temperature"])}
     
     def health_check(self) -> bool:
         """Check if the data source is accessible."""
@@ -2,58 +2,58 @@
 Quick start example showing how to use DeepSense Framework
 """
 
+import asyncio
 import os
-from deepsense import Workflow, MongoDBCheckpointer
-from example.workflow_instance import invoke_workflow
+from deepsense import Workflow
+# Shares the example workflow's checkpointer, so the examples use one MongoDB client
+from example.workflow_instance import checkpointer, invoke_workflow
+
+
+async def ainvoke_workflow(*args, **kwargs):
+    """Run invoke_workflow in a worker thread so several examples can overlap."""
+    return await asyncio.to_thread(invoke_workflow, *args, **kwargs)
+
+# Each example prints its section once its calls are done, so the
+# concurrently running examples do not interleave their output.
 
 # Example 1: Simple workflow invocation
-def example_simple_query():
+async def example_simple_query():
     """Simple example of invoking the workflow."""
+    result = await ainvoke_workflow("What is the current price of bitcoin?")
+    
     print("Example 1: Simple Query")
     print("-" * 50)
-    
-    result = invoke_workflow("What is the current price of bitcoin?")
-    
     if result and 'messages' in result:
         last_message = result['messages'][-1]
         print(f"Response: {last_message.content}")
     print()
 
 # Example 2: Workflow with session
-def example_with_session():
+async def example_with_session():
     """Example with session management."""
-    print("Example 2: Query with Session")
-    print("-" * 50)
-    
-    # Create checkpointer
-    checkpointer = MongoDBCheckpointer(
-        connection_string=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"),
-        database_name="deepsense_example"
-    )
-    
     # Create session
-    session_id = checkpointer.create_session(user_id="demo_user")
-    print(f"Created session: {session_id}")
+    session_id = await asyncio.to_thread(checkpointer.create_session, user_id="demo_user")
     
     # First query
-    result1 = invoke_workflow("What is bitcoin?", session_id=session_id)
-    print(f"First response: {result1['messages'][-1].content[:100]}...")
+    result1 = await ainvoke_workflow("What is bitcoin?", session_id=session_id)
     
-    # Second query (with context)
-    result2 = invoke_workflow("What about ethereum?", session_id=session_id)
-    print(f"Second response: {result2['messages'][-1].content[:100]}...")
+    # Second query (with context), so it runs after the first
+    result2 = await ainvoke_workflow("What about ethereum?", session_id=session_id)
     
     # Get all messages
-    messages = checkpointer.get_messages(session_id)
+    messages = await asyncio.to_thread(checkpointer.get_messages, session_id)
+    
+    print("Example 2: Query with Session")
+    print("-" * 50)
+    print(f"Created session: {session_id}")
+    print(f"First response: {result1['messages'][-1].content[:100]}...")
+    print(f"Second response: {result2['messages'][-1].content[:100]}...")
     print(f"\nTotal messages in session: {len(messages)}")
     print()
 
 # Example 3: Custom workflow
-def example_custom_workflow():
+async def example_custom_workflow():
     """Example of creating a custom workflow."""
-    print("Example 3: Custom Workflow")
-    print("-" * 50)
-    
     from langchain_core.tools import Tool
     
     # Create a simple custom tool
@@ -68,20 +68,26 @@ def example_custom_workflow():
     )
     
     # Create workflow with custom tool
-    checkpointer = MongoDBCheckpointer(
-        connection_string=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"),
-        database_name="deepsense_example"
-    )
-    
     workflow = Workflow(
         checkpointer=checkpointer,
         custom_tools=[custom_tool]
     )
     
-    result = workflow.invoke("Use the hello tool to greet Alice")
+    result = await asyncio.to_thread(workflow.invoke, "Use the hello tool to greet Alice")
+    
+    print("Example 3: Custom Workflow")
+    print("-" * 50)
     print(f"Response: {result['messages'][-1].content}")
     print()
 
+async def run_examples():
+    """Run the examples concurrently."""
+    await asyncio.gather(
+        example_simple_query(),
+        example_with_session(),
+        example_custom_workflow()
+    )
+
 if __name__ == "__main__":
     print("=" * 50)
     print("DeepSense Framework - Quick Start Examples")
@@ -94,9 +100,7 @@ if __name__ == "__main__":
         print()
     
     try:
-        example_simple_query()
-        example_with_session()
-        example_custom_workflow()
+        asyncio.run(run_examples())
         
         print("=" * 50)
         print("✅ Examples completed!")
@@ -3,26 +3,43 @@ FastAPI server that uses the example workflow
 Maintains its own message history separate from LangGraph checkpointer
 """
 
+import asyncio
 import os
 import uuid
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Tuple
 import uvicorn
-from datetime import datetime
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.database import Database
+from datetime import datetime, timezone
+from pymongo import AsyncMongoClient, IndexModel, ReturnDocument
+from pymongo.errors import PyMongoError
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 import logging
 
-from example.workflow_instance import invoke_workflow, checkpointer
+from deepsense.checkpointer import MONGO_CLIENT_OPTIONS, ZSTD_AVAILABLE
+from deepsense.utils.json_utils import json_dumps
+from deepsense.utils.ttl_cache import TTLCache
+from example.workflow_instance import invoke_workflow, stream_workflow, checkpointer
 
 logger = logging.getLogger(__name__)
 
+# _id of the marker document recording that legacy sessions have counters
+_COUNTERS_SEEDED = "__seeded__"
+
 # Message History Manager - separate from checkpointer
 class MessageHistory:
-    """Manages message history for the server, separate from LangGraph checkpointer."""
+    """
+    Manages message history for the server, separate from LangGraph checkpointer.
+    
+    Uses pymongo's async client so Mongo I/O does not block the event loop.
+    The client is created by connect() inside the running server process (after
+    any worker fork), so each worker gets its own connection pool.
+    """
     
     def __init__(
         self,
@@ -34,31 +51,78 @@ class MessageHistory:
         self.connection_string = connection_string or os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
         self.database_name = database_name
         self.collection_name = collection_name
-        
+        self.client: Optional[AsyncMongoClient] = None
+        self._index_task: Optional[asyncio.Task] = None
+    
+    async def connect(self):
+        """Create the MongoDB client and start ensuring indexes in the background."""
         try:
-            self.client = MongoClient(self.connection_string)
-            self.db: Database = self.client[database_name]
-            self.collection: Collection = self.db[collection_name]
+            # Compress history reads/writes on the wire; zlib is the fallback without zstandard
+            self.client = AsyncMongoClient(
+                self.connection_string,
+                compressors="zstd,zlib" if ZSTD_AVAILABLE else "zlib",
+                **MONGO_CLIENT_OPTIONS
+            )
+            self.db: AsyncDatabase = self.client[self.database_name]
+            self.collection: AsyncCollection = self.db[self.collection_name]
+            # Per-session sequence counters: {_id: session_id, seq: last sequence_order}
+            self.counters: AsyncCollection = self.db[f"{self.collection_name}_counters"]
+            # Must finish before any message is saved
+            await self._seed_counters()
             
-            # Create indexes
-            self.collection.create_index("session_id")
-            self.collection.create_index([("session_id", 1), ("sequence_order", 1)])
-            self.collection.create_index("timestamp")
+            # Indexes usually exist already; don't hold up startup creating them
+            self._index_task = asyncio.create_task(self._ensure_indexes())
             
-            logger.info(f"✅ Initialized MessageHistory: {database_name}.{collection_name}")
+            logger.info(f"✅ Initialized MessageHistory: {self.database_name}.{self.collection_name}")
         except Exception as e:
             logger.error(f"❌ Failed to initialize MessageHistory: {e}")
             raise
     
-    def save_message(
+    async def _seed_counters(self):
+        """
+        Seed counters for sessions saved before counters existed, once per database.
+        
+        Sets each session's counter to at least its highest stored sequence_order
+        so new messages continue after it. $max makes concurrent runs (several
+        workers starting at once) safe, and a marker document skips later runs.
+        """
+        if await self.counters.find_one({"_id": _COUNTERS_SEEDED}):
+            return
+        cursor = await self.collection.aggregate([
+            {"$group": {"_id": "$session_id", "seq": {"$max": "$sequence_order"}}},
+            {"$merge": {
+                "into": self.counters.name,
+                "whenMatched": [{"$set": {"seq": {"$max": ["$seq", "$$new.seq"]}}}],
+                "whenNotMatched": "insert"
+            }}
+        ])
+        await cursor.to_list()
+        await self.counters.update_one({"_id": _COUNTERS_SEEDED}, {"$set": {"seeded_at": datetime.now(timezone.utc)}}, upsert=True)
+        logger.info(f"✅ Seeded message sequence counters in {self.counters.name}")
+    
+    async def _ensure_indexes(self):
+        """Create the message indexes in one call (a no-op for indexes that already exist)."""
+        try:
+            # The compound index also serves queries on session_id alone
+            await self.collection.create_indexes([
+                IndexModel([("session_id", 1), ("sequence_order", 1)]),
+                IndexModel("timestamp")
+            ])
+        except PyMongoError as e:
+            logger.warning(f"⚠️  Could not create MessageHistory indexes: {e}")
+    
+    def build_message(
         self,
         session_id: str,
         message_type: str,
         content: Dict[str, Any],
         metadata: Optional[Dict[str, Any]] = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
-        Save a user or agent message to message history.
+        Build a message document; its sequence order is assigned when it is saved.
+        
+        The message timestamp is read once and also recorded in the metadata
+        (as an ISO string) unless the metadata already has a timestamp.
         
         Args:
             session_id: Session ID
@@ -67,31 +131,75 @@ class MessageHistory:
             metadata: Optional metadata dictionary
             
         Returns:
-            message_id: The message ID
+            Message document
         """
-        # Get the next sequence order
-        last_message = self.collection.find_one(
-            {"session_id": session_id},
-            sort=[("sequence_order", -1)]
-        )
-        sequence_order = (last_message["sequence_order"] + 1) if last_message else 1
-        
-        message_doc = {
+        timestamp = datetime.now(timezone.utc)
+        return {
             "message_id": str(uuid.uuid4()),
             "session_id": session_id,
             "message_type": message_type,  # 'user' or 'agent'
             "content": content,
-            "timestamp": datetime.utcnow(),
-            "sequence_order": sequence_order,
-            "metadata": metadata or {}
+            "timestamp": timestamp,
+            "metadata": {"timestamp": timestamp.isoformat(), **(metadata or {})}
         }
+    
+    async def _reserve_sequence(self, session_id: str, count: int) -> int:
+        """Atomically reserve count sequence numbers for a session and return the first."""
+        counter = await self.counters.find_one_and_update(
+            {"_id": session_id},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            projection={"seq": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"] - count + 1
+    
+    async def save_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save several messages built with build_message in one write, in list order.
         
-        self.collection.insert_one(message_doc)
+        Args:
+            session_id: Session ID
+            messages: Message documents from build_message
+            
+        Returns:
+            The message IDs
+        """
+        if not messages:
+            return []
+        
+        first = await self._reserve_sequence(session_id, len(messages))
+        for offset, message_doc in enumerate(messages):
+            message_doc["sequence_order"] = first + offset
+        
+        await self.collection.insert_many(messages, ordered=False)
         
-        logger.info(f"✅ Saved {message_type} message {message_doc['message_id']} to session {session_id}")
-        return message_doc["message_id"]
+        logger.info(f"✅ Saved {len(messages)} message(s) to session {session_id}")
+        return [message_doc["message_id"] for message_doc in messages]
+    
+    async def save_message(
+        self,
+        session_id: str,
+        message_type: str,
+        content: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Save a user or agent message to message history.
+        
+        Args:
+            session_id: Session ID
+            message_type: Type of message ('user' or 'agent')
+            content: Message content as dictionary
+            metadata: Optional metadata dictionary
+            
+        Returns:
+            message_id: The message ID
+        """
+        message_doc = self.build_message(session_id, message_type, content, metadata)
+        return (await self.save_messages(session_id, [message_doc]))[0]
     
-    def get_messages(
+    async def get_messages(
         self,
         session_id: str,
         limit: Optional[int] = None,
@@ -106,27 +214,25 @@ class MessageHistory:
             message_type: Optional filter by message type ('user' or 'agent')
             
         Returns:
-            List of message dictionaries
+            List of message dictionaries (without Mongo's _id)
         """
         query = {"session_id": session_id}
         
         if message_type:
             query["message_type"] = message_type
         
-        cursor = self.collection.find(query).sort("sequence_order", 1)
+        # _id is left out, so the driver does not decode ObjectIds that callers never use
+        cursor = self.collection.find(query, projection={"_id": 0}).sort("sequence_order", 1).batch_size(200)
         
         if limit:
             cursor = cursor.limit(limit)
         
-        messages = []
-        for msg in cursor:
-            msg["_id"] = str(msg["_id"])
-            messages.append(msg)
+        messages = await cursor.to_list()
         
         logger.info(f"✅ Retrieved {len(messages)} messages for session {session_id}")
         return messages
     
-    def get_conversation_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    async def get_conversation_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get conversation history (user and agent messages) for display.
         
@@ -137,9 +243,9 @@ class MessageHistory:
         Returns:
             List of message dictionaries with 'user' and 'agent' messages
         """
-        return self.get_messages(session_id, limit=limit)
+        return await self.get_messages(session_id, limit=limit)
     
-    def delete_messages(self, session_id: str) -> int:
+    async def delete_messages(self, session_id: str) -> int:
         """
         Delete all messages for a session.
         
@@ -149,24 +255,47 @@ class MessageHistory:
         Returns:
             Number of messages deleted
         """
-        result = self.collection.delete_many({"session_id": session_id})
+        result = await self.collection.delete_many({"session_id": session_id})
+        await self.counters.delete_one({"_id": session_id})
         logger.info(f"✅ Deleted {result.deleted_count} messages for session {session_id}")
         return result.deleted_count
     
-    def close(self):
+    async def close(self):
         """Close the MongoDB connection."""
+        if self._index_task and not self._index_task.done():
+            self._index_task.cancel()
+        self._index_task = None
         if self.client:
-            self.client.close()
+            await self.client.close()
+            self.client = None
             logger.info("Closed MessageHistory MongoDB connection")
 
 # Initialize message history manager
 message_history = MessageHistory()
 
+# LangGraph saver, looked up once
+saver = checkpointer.get_saver()
+
+# Sessions this process has already registered with the checkpointer
+known_sessions = TTLCache(maxsize=10000, ttl=3600)
+
+# /state responses by session for one second, so polling clients do not each read the checkpoint;
+# dropped when a query on the session finishes
+state_cache = TTLCache(maxsize=1024, ttl=1.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect inside the worker process so each worker has its own pool
+    await message_history.connect()
+    yield
+    await message_history.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="DeepSense Example API",
     description="Example API using DeepSense Framework",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -203,6 +332,66 @@ class Message(BaseModel):
     sequence_order: int
     metadata: Optional[Dict[str, Any]] = None
 
+def _final_response(result: Optional[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Get the final response text and user_actions (if any) from a workflow result."""
+    final_response = ""
+    if result and 'messages' in result and result['messages']:
+        last_message = result['messages'][-1]
+        if hasattr(last_message, 'content'):
+            final_response = last_message.content
+    
+    user_actions = result.get('user_actions', []) if result else []
+    return final_response, user_actions
+
+async def _ensure_session(session_id: Optional[str], user_id: Optional[str]) -> str:
+    """Get or create a session, skipping the checkpointer for sessions already seen by this process."""
+    if session_id and session_id in known_sessions:
+        return session_id
+    session_id = await asyncio.to_thread(checkpointer.create_session, user_id=user_id, session_id=session_id)
+    known_sessions.set(session_id, True)
+    return session_id
+
+async def _iterate_in_thread(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """Consume a blocking iterator in a worker thread, yielding its items without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    def pump():
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(queue.put_nowait, ("item", item))
+            loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, ("error", e))
+    
+    loop.run_in_executor(None, pump)
+    while True:
+        kind, value = await queue.get()
+        if kind == "done":
+            return
+        if kind == "error":
+            raise value
+        yield value
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json_dumps(data)}\n\n"
+
+# Message history writes scheduled after a streamed response; held so they are not garbage collected
+_background_writes: set = set()
+
+def _save_in_background(session_id: str, messages: List[Dict[str, Any]]) -> None:
+    """Save messages to history without holding up the response."""
+    async def save():
+        try:
+            await message_history.save_messages(session_id, messages)
+        except Exception as e:
+            logger.error(f"❌ Failed to save messages for session {session_id}: {e}")
+    
+    task = asyncio.create_task(save())
+    _background_writes.add(task)
+    task.add_done_callback(_background_writes.discard)
+
 @app.post("/query", response_model=QueryResponse)
 async def process_query(request: QueryRequest):
     """
@@ -217,45 +406,41 @@ async def process_query(request: QueryRequest):
     - "What's the price of bitcoin?"
     - "Get info about the langchain-ai/langchain repository"
     """
+    session_id = None
+    user_message = None
     try:
         # Get or create session
-        session_id = request.session_id
-        if not session_id:
-            session_id = checkpointer.create_session(user_id=request.user_id)
-        else:
-            session_id = checkpointer.create_session(user_id=request.user_id, session_id=session_id)
+        session_id = await _ensure_session(request.session_id, request.user_id)
         
-        # Save user message to message history (managed by server, separate from checkpointer)
-        message_history.save_message(
+        # User message for message history (managed by server, separate from checkpointer);
+        # written together with the agent response once the workflow has run
+        user_message = message_history.build_message(
             session_id=session_id,
             message_type="user",
             content={"text": request.query},
-            metadata={"source": "api_query", "timestamp": str(datetime.now())}
+            metadata={"source": "api_query"}
         )
         
         # Invoke workflow (LangGraph checkpointer handles workflow state automatically)
-        result = invoke_workflow(
+        # The workflow blocks on LLM and tool calls, so it runs in the threadpool to keep the event loop free
+        result = await run_in_threadpool(
+            invoke_workflow,
             query=request.query,
             session_id=session_id
         )
         
-        # Get final response
-        final_response = ""
-        if result and 'messages' in result and result['messages']:
-            last_message = result['messages'][-1]
-            if hasattr(last_message, 'content'):
-                final_response = last_message.content
-        
-        # Get user_actions from result (if any)
-        user_actions = result.get('user_actions', []) if result else []
+        state_cache.pop(session_id)
+        final_response, user_actions = _final_response(result)
         
-        # Save agent response to message history (managed by server, separate from checkpointer)
-        message_history.save_message(
+        # Save user message and agent response to message history in one write
+        agent_message = message_history.build_message(
             session_id=session_id,
             message_type="agent",
             content={"text": final_response},
-            metadata={"source": "workflow_response", "timestamp": str(datetime.now())}
+            metadata={"source": "workflow_response"}
         )
+        await message_history.save_messages(session_id, [user_message, agent_message])
+        user_message = None
         
         return QueryResponse(
             query=request.query,
@@ -266,6 +451,12 @@ async def process_query(request: QueryRequest):
         )
         
     except Exception as e:
+        if user_message is not None:
+            # Keep the user's message in history even though the workflow failed
+            try:
+                await message_history.save_messages(session_id, [user_message])
+            except Exception as save_error:
+                logger.error(f"❌ Failed to save user message: {save_error}")
         return QueryResponse(
             query=request.query,
             response="",
@@ -274,6 +465,64 @@ async def process_query(request: QueryRequest):
             error=str(e)
         )
 
+@app.post("/query/stream")
+async def process_query_stream(request: QueryRequest):
+    """
+    Process a user query through the workflow, streaming the response as server-sent events.
+    
+    Emits `token` events ({"text": ...}) as the model generates its answer, then a
+    `done` event with the same fields as the /query response (or an `error` event).
+    The user and agent messages are saved to message history after the stream ends.
+    """
+    session_id = request.session_id
+    try:
+        session_id = await _ensure_session(session_id, request.user_id)
+    except Exception as e:
+        return StreamingResponse(
+            iter([_sse("error", {"query": request.query, "session_id": session_id or "", "error": str(e)})]),
+            media_type="text/event-stream"
+        )
+    
+    user_message = message_history.build_message(
+        session_id=session_id,
+        message_type="user",
+        content={"text": request.query},
+        metadata={"source": "api_query"}
+    )
+    
+    async def events():
+        to_save = [user_message]
+        try:
+            result = None
+            async for kind, payload in _iterate_in_thread(stream_workflow(request.query, session_id)):
+                if kind == "token":
+                    yield _sse("token", {"text": payload})
+                else:
+                    result = payload
+            
+            state_cache.pop(session_id)
+            final_response, user_actions = _final_response(result)
+            to_save.append(message_history.build_message(
+                session_id=session_id,
+                message_type="agent",
+                content={"text": final_response},
+                metadata={"source": "workflow_response"}
+            ))
+            yield _sse("done", {
+                "query": request.query,
+                "response": final_response,
+                "session_id": session_id,
+                "success": True,
+                "user_actions": user_actions
+            })
+        except Exception as e:
+            yield _sse("error", {"query": request.query, "session_id": session_id, "error": str(e)})
+        finally:
+            # Also runs if the client disconnects mid-stream
+            _save_in_background(session_id, to_save)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/sessions")
 async def create_session(user_id: Optional[str] = None):
     """Create a new session."""
@@ -300,7 +549,7 @@ async def get_messages(session_id: str, limit: Optional[int] = None):
     This returns user and agent messages (managed by server, separate from LangGraph checkpoints).
     """
     try:
-        messages = message_history.get_conversation_history(session_id, limit=limit)
+        messages = await message_history.get_conversation_history(session_id, limit=limit)
         
         return [
             Message(
@@ -323,21 +572,26 @@ async def get_state(session_id: str):
     Get the current workflow state for a session.
     This retrieves the checkpoint stored by LangGraph (separate from message history).
     """
+    cached = state_cache.get(session_id)
+    if cached is not None:
+        return cached
+    
     try:
         # Get the latest checkpoint from LangGraph
-        saver = checkpointer.get_saver()
         if saver:
-            # Use LangGraph's saver to get checkpoint
-            checkpoint = saver.get({"configurable": {"thread_id": session_id}})
+            # Use LangGraph's saver to get checkpoint (a blocking read, so off the event loop)
+            checkpoint = await asyncio.to_thread(saver.get, {"configurable": {"thread_id": session_id}})
             if checkpoint:
-                return {
+                state = {
                     "session_id": session_id,
                     "state": checkpoint.get("channel_values", {}),
                     "checkpoint_id": checkpoint.get("id"),
                     "checkpoint_ns": checkpoint.get("checkpoint_ns")
                 }
             else:
-                return {"session_id": session_id, "state": None, "message": "No checkpoint found"}
+                state = {"session_id": session_id, "state": None, "message": "No checkpoint found"}
+            state_cache.set(session_id, state)
+            return state
         else:
             raise HTTPException(status_code=500, detail="LangGraph checkpointer not available")
     except Exception as e:
@@ -6,14 +6,13 @@ All tools are created from datasources using deepsense/datasource.py
 import os
 from deepsense import Workflow, MongoDBCheckpointer
 from deepsense.datasource import DataSourceManager
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 
-# Import all datasources
-from example.datasources import (
-    CryptoDataSource, GitHubDataSource, HeliusDataSource, JupiterDataSource,
-    WeatherDataSource, FlightDataSource, LocationDataSource, DPSNDataSource,
-    CoinGeckoDataSource, NewsDataSource
-)
+from concurrent.futures import ThreadPoolExecutor
+
+# Datasource classes are resolved inside their factories, so modules for
+# disabled datasources are never imported
+from example import datasources
 
 # Import system prompt
 from deepsense import get_system_prompt
@@ -21,66 +20,51 @@ from deepsense import get_system_prompt
 # Create datasource manager
 datasource_manager = DataSourceManager()
 
-# Register all datasources
-try:
-    if os.getenv("HELIUS_API_KEY"):
-        helius_source = HeliusDataSource(api_key=os.getenv("HELIUS_API_KEY"))
-        datasource_manager.register_source("helius", helius_source)
-except Exception as e:
-    print(f"Warning: Could not register Helius datasource: {e}")
-
-jupiter_source = JupiterDataSource()
-datasource_manager.register_source("jupiter", jupiter_source)
-
-coingecko_source = CoinGeckoDataSource()
-datasource_manager.register_source("coingecko", coingecko_source)
-
-try:
-    if os.getenv("NEWS_API_KEY"):
-        news_source = NewsDataSource(api_key=os.getenv("NEWS_API_KEY"))
-        datasource_manager.register_source("news", news_source)
-except Exception as e:
-    print(f"Warning: Could not register News datasource: {e}")
-
-github_source = GitHubDataSource(api_key=os.getenv("GITHUB_API_KEY"))
-datasource_manager.register_source("github", github_source)
-
-try:
-    if os.getenv("OPENWEATHER_API_KEY"):
-        weather_source = WeatherDataSource(api_key=os.getenv("OPENWEATHER_API_KEY"))
-        datasource_manager.register_source("weather", weather_source)
-except Exception as e:
-    print(f"Warning: Could not register Weather datasource: {e}")
-
-try:
-    if os.getenv("AMADEUS_CLIENT_ID") and os.getenv("AMADEUS_CLIENT_SECRET"):
-        flight_source = FlightDataSource(
-            client_id=os.getenv("AMADEUS_CLIENT_ID"),
-            client_secret=os.getenv("AMADEUS_CLIENT_SECRET")
-        )
-        location_source = LocationDataSource(
-            client_id=os.getenv("AMADEUS_CLIENT_ID"),
-            client_secret=os.getenv("AMADEUS_CLIENT_SECRET")
-        )
-        datasource_manager.register_source("flight", flight_source)
-        datasource_manager.register_source("location", location_source)
-except Exception as e:
-    print(f"Warning: Could not register Flight/Location datasources: {e}")
-
-try:
-    if os.getenv("DPSN_API_TOKEN"):
-        dpsn_source = DPSNDataSource(api_token=os.getenv("DPSN_API_TOKEN"))
-        datasource_manager.register_source("dpsn", dpsn_source)
-except Exception as e:
-    print(f"Warning: Could not register DPSN datasource: {e}")
-
-# Automatically create tools from all registered datasources using @tool decorator
-all_tools = []
-for source_name in datasource_manager.list_sources():
+# (name, factory) for every enabled datasource, in registration order
+datasource_factories = [
+    ("jupiter", lambda: datasources.JupiterDataSource()),
+    ("coingecko", lambda: datasources.CoinGeckoDataSource()),
+    ("github", lambda: datasources.GitHubDataSource(api_key=os.getenv("GITHUB_API_KEY"))),
+]
+if os.getenv("HELIUS_API_KEY"):
+    datasource_factories.insert(0, ("helius", lambda: datasources.HeliusDataSource(api_key=os.getenv("HELIUS_API_KEY"))))
+if os.getenv("NEWS_API_KEY"):
+    datasource_factories.append(("news", lambda: datasources.NewsDataSource(api_key=os.getenv("NEWS_API_KEY"))))
+if os.getenv("OPENWEATHER_API_KEY"):
+    datasource_factories.append(("weather", lambda: datasources.WeatherDataSource(api_key=os.getenv("OPENWEATHER_API_KEY"))))
+if os.getenv("AMADEUS_CLIENT_ID") and os.getenv("AMADEUS_CLIENT_SECRET"):
+    datasource_factories.append(("flight", lambda: datasources.FlightDataSource(
+        client_id=os.getenv("AMADEUS_CLIENT_ID"),
+        client_secret=os.getenv("AMADEUS_CLIENT_SECRET")
+    )))
+    datasource_factories.append(("location", lambda: datasources.LocationDataSource(
+        client_id=os.getenv("AMADEUS_CLIENT_ID"),
+        client_secret=os.getenv("AMADEUS_CLIENT_SECRET")
+    )))
+if os.getenv("DPSN_API_TOKEN"):
+    datasource_factories.append(("dpsn", lambda: datasources.DPSNDataSource(api_token=os.getenv("DPSN_API_TOKEN"))))
+
+
+def _build_tools(source_name: str) -> List[Any]:
     source = datasource_manager.get_source(source_name)
-    if source:
+    return source.get_tools() if source else []
+
+
+# Construct datasources and collect their tools concurrently; registration
+# and tool order still follow datasource_factories
+all_tools = []
+with ThreadPoolExecutor(max_workers=len(datasource_factories)) as executor:
+    futures = [(name, executor.submit(factory)) for name, factory in datasource_factories]
+    for name, future in futures:
+        try:
+            datasource_manager.register_source(name, future.result())
+        except Exception as e:
+            print(f"Warning: Could not register {name} datasource: {e}")
+
+    futures = [(name, executor.submit(_build_tools, name)) for name in datasource_manager.list_sources()]
+    for source_name, future in futures:
         try:
-            tools = source.get_tools()
+            tools = future.result()
             all_tools.extend(tools)
             print(f"✅ Created {len(tools)} tool(s) from {source_name} datasource")
         except Exception as e:
@@ -119,3 +103,16 @@ def invoke_workflow(query: str, session_id: str = None) -> Dict[str, Any]:
         Workflow result with user_actions if any
     """
     return workflow.invoke(query, session_id=session_id)
+
+def stream_workflow(query: str, session_id: str = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Run the workflow with a query, yielding response tokens as they are generated.
+    
+    Args:
+        query: User query
+        session_id: Optional session ID
+        
+    Returns:
+        Iterator of ("token", text) pairs, then ("result", state) with the final workflow result
+    """
+    return workflow.stream(query, session_id=session_id)